@@ -1,122 +1,30 @@
-import json
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
-#  Tkinter GUI for studieplan
+from studieplan_catalog import is_catalog_path, open_catalog, save_catalog
+from studieplan_core import TERMS, Model, PlanShape
+from studieplan_import import import_courses
+from studieplan_io import load_plan, save_plan
+import studieplan_profile as profile
+from studieplan_journal import Journal, has_journal
+from studieplan_profile import timed
+from studieplan_sqlite import SqliteStore, is_sqlite_path
 
-class Model:
-    def __init__(self):
-        self.courses = []  # {id, kode, semester, stp}
-        self._next_id = 1
-        self.plan = [[] for _ in range(6)]  # 6 semestre, holder course_id
-
-    def term_for_semester_index(self, idx):
-        return "høst" if idx in (0, 2, 4) else "vår"
-
-    def add_course(self, kode: str, semester: str, stp: int):
-        if any(c["kode"].lower() == kode.lower() for c in self.courses):
-            raise ValueError(f"Emnekode '{kode}' finnes allerede.")
-        if semester not in ("høst", "vår"):
-            raise ValueError("Semester må være 'høst' eller 'vår'.")
-        if not isinstance(stp, int) or stp <= 0 or stp > 30:
-            raise ValueError("Studiepoeng må være heltall mellom 1 og 30.")
-        c = {"id": self._next_id, "kode": kode, "semester": semester, "stp": int(stp)}
-        self._next_id += 1
-        self.courses.append(c)
-        return c
-
-    def delete_course(self, cid: int):
-        """Frivillig 9: Slett et emne. Fjerner også fra studieplanen hvis tilstede."""
-        course = self.get_course(cid)
-        if not course:
-            raise ValueError("Fant ikke emnet.")
-        # Fjern fra alle semestre
-        for i in range(6):
-            if cid in self.plan[i]:
-                self.plan[i] = [x for x in self.plan[i] if x != cid]
-        # Fjern fra emnelista
-        self.courses = [c for c in self.courses if c["id"] != cid]
-
-    def get_course(self, cid):
-        return next((c for c in self.courses if c["id"] == cid), None)
-
-    def course_in_plan(self, cid):
-        return any(cid in sem for sem in self.plan)
-
-    def total_credits(self, sem_idx):
-        return sum(self.get_course(cid)["stp"] for cid in self.plan[sem_idx])
-
-    def add_course_to_semester(self, cid, sem_idx):
-        c = self.get_course(cid)
-        if not c:
-            raise ValueError("Ugyldig emne.")
-        if self.course_in_plan(cid):
-            raise ValueError("Emnet er allerede i studieplanen.")
-        riktig_term = self.term_for_semester_index(sem_idx)
-        if c["semester"] != riktig_term:
-            allowed = "1/3/5" if c["semester"] == "høst" else "2/4/6"
-            raise ValueError(f"{c['kode']} er et {c['semester']}-emne og kan bare ligge i semester {allowed}.")
-        if self.total_credits(sem_idx) + c["stp"] > 30:
-            raise ValueError(f"Ikke plass i semester {sem_idx+1} (maks 30 stp).")
-        self.plan[sem_idx].append(cid)
-
-    def remove_course_from_semester(self, cid, sem_idx):
-        if cid in self.plan[sem_idx]:
-            self.plan[sem_idx].remove(cid)
+#  Tkinter GUI for studieplan (modellen ligger i studieplan_core.py)
 
-    def clear_semester(self, sem_idx):
-        self.plan[sem_idx].clear()
-
-    def validate_plan(self):
-        invalid = []
-        for i in range(6):
-            tot = self.total_credits(i)
-            if tot != 30:
-                invalid.append((i, tot))
-        return invalid
-
-    def to_json(self):
-        return {"next_id": self._next_id, "courses": self.courses, "plan": self.plan}
-
-    def load_json(self, data):
-        # next_id
-        try:
-            self._next_id = int(data.get("next_id", 1))
-        except Exception:
-            self._next_id = 1
-        # courses (valider felt)
-        new_courses = []
-        seen_codes = set()
-        for c in data.get("courses", []):
-            try:
-                cid = int(c.get("id"))
-                kode = str(c.get("kode")).strip()
-                sem = c.get("semester")
-                stp = int(c.get("stp"))
-                if not kode or sem not in ("høst", "vår") or stp < 1 or stp > 30:
-                    continue
-                if kode.lower() in seen_codes:
-                    continue
-                new_courses.append({"id": cid, "kode": kode, "semester": sem, "stp": stp})
-                seen_codes.add(kode.lower())
-            except Exception:
-                continue
-        self.courses = new_courses
-        # plan
-        new_plan = [[] for _ in range(6)]
-        raw_plan = data.get("plan", [[] for _ in range(6)])
-        valid_ids = {c["id"] for c in self.courses}
-        for i in range(6):
-            try:
-                ids = [int(x) for x in raw_plan[i]] if i < len(raw_plan) else []
-            except Exception:
-                ids = []
-            # filtrer til gyldige id-er
-            new_plan[i] = [cid for cid in ids if cid in valid_ids]
-        self.plan = new_plan
+# ---------- GUI ----------
+COURSE_PAGE = 200  # emner som legges inn i tabellen om gangen
+AUTOSAVE_DELAY_MS = 2000  # vent så lenge etter siste endring før autolagring
+PLAN_FILETYPES = [("JSON", "*.json"), ("SQLite", "*.sqlite *.sqlite3 *.db"), ("Emnekatalog", "*.spcat"), ("Alle filer", "*.*")]
 
+def _write_plan(model, path, compact):
+    # Hele planen til fil, i formatet filendelsen tilsier
+    if is_catalog_path(path):
+        return save_catalog(model, path)
+    return save_plan(model, path, compact=compact)
 
-# ---------- GUI ----------
 class App(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -124,9 +32,26 @@ class App(tk.Tk):
         self.geometry("1200x760")
         self.minsize(1100, 660)
         self.model = Model()
+        self.model.subscribe(self._on_model_event)
         self.theme = "dark"  
         self._dirty = False   # spor om det finnes ulagrede endringer
         self.current_file = None
+        self.compact_save = tk.BooleanVar(value=False)  # lagre uten innrykk
+        # Autolagring til current_file: endringer samles opp og lagres i en egen tråd
+        self.autosave = tk.BooleanVar(value=False)
+        self._autosave_job = None     # planlagt after()-kall
+        self._autosave_thread = None
+        self._autosave_result = None  # (edits, sekunder eller unntak) fra tråden
+        self._edits = 0               # teller endringer i modellen
+        self._saved_edits = 0         # verdien av _edits ved siste lagring
+        # Journal-lagring: hver endring skrives straks til current_file + ".log"
+        # (eller til databasen når current_file er en SQLite-plan)
+        self.journal_mode = tk.BooleanVar(value=False)
+        self.journal = None  # Journal eller SqliteStore
+        # Profilering (Fil → Profilering); kan også slås på med STUDIEPLAN_PROFILE
+        self.profiling = tk.BooleanVar(value=profile.enabled())
+        self._idle_probe = None  # tidspunkt for første ikke-målte endring før Tk ble ledig
+        self._profile_panel = None
 
         self.palettes = {
             "light": {
@@ -193,6 +118,11 @@ class App(tk.Tk):
 
         style.configure("TLabelframe", background=p["panel"], relief="flat")
         style.configure("TLabelframe.Label", background=p["panel"], foreground=p["subtle"], font=("Segoe UI", 10, "bold"))
+        # Semesterruter som kan ta imot det valgte emnet (se _highlight_semesters)
+        style.configure("Fits.TLabelframe", background=p["panel"], relief="solid", bordercolor=p["success"])
+        style.configure("Fits.TLabelframe.Label", background=p["panel"], foreground=p["success"], font=("Segoe UI", 10, "bold"))
+        style.configure("Risky.TLabelframe", background=p["panel"], relief="solid", bordercolor=p["warning"])
+        style.configure("Risky.TLabelframe.Label", background=p["panel"], foreground=p["warning"], font=("Segoe UI", 10, "bold"))
 
         # Knappestiler
         style.configure("TButton", padding=8, background=p["muted"], foreground=p["text"])
@@ -239,6 +169,7 @@ class App(tk.Tk):
         ttk.Button(toolbar, text="➕ Nytt emne (Ctrl+N)", command=self.open_add_course_dialog, style="Primary.TButton").pack(side=tk.LEFT, padx=(4, 6))
         ttk.Button(toolbar, text="📥 Legg i semester", command=self.add_selected_course_to_selected_sem).pack(side=tk.LEFT, padx=6)
         ttk.Button(toolbar, text="🗑️ Slett emne", command=self.delete_selected_course).pack(side=tk.LEFT, padx=6)
+        ttk.Button(toolbar, text="🧩 Auto-plan", command=self.auto_plan).pack(side=tk.LEFT, padx=6)
         ttk.Button(toolbar, text="✅ Valider (F5)", command=self.validate_plan).pack(side=tk.LEFT, padx=6)
         ttk.Button(toolbar, text="💾 Lagre (Ctrl+S)", command=self.save_to_file).pack(side=tk.LEFT, padx=6)
         ttk.Button(toolbar, text="📂 Åpne (Ctrl+O)", command=self.load_from_file).pack(side=tk.LEFT, padx=6)
@@ -258,67 +189,113 @@ class App(tk.Tk):
         left = ttk.Frame(content, style="Panel.TFrame")
         left.grid(row=0, column=0, sticky="nsew", padx=(0, 8))
         left.columnconfigure(0, weight=1)
-        ttk.Label(left, text="Registrerte emner", style="Subheader.TLabel").pack(anchor="w", padx=12, pady=(12, 0))
-
-        self.course_tree = ttk.Treeview(left, columns=("kode", "semester", "stp"), show="headings")
+        self.course_count_label = ttk.Label(left, text="Registrerte emner", style="Subheader.TLabel")
+        self.course_count_label.pack(anchor="w", padx=12, pady=(12, 0))
+        # Søk på emnekode: tabellen snevres inn for hvert tastetrykk (prefiksindeks i modellen)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *_: self._on_search())
+        self._search_hits = None  # emnene som matcher søket, eller None uten søk
+        search_entry = ttk.Entry(left, textvariable=self.search_var)
+        search_entry.pack(fill=tk.X, padx=12, pady=(8, 0))
+
+        # Tabellen fylles side for side: bare radene man har scrollet til finnes i Tk
+        self._courses_shown = 0
+        self._more_pending = False
+        tree_wrap = ttk.Frame(left, style="Panel.TFrame")
+        tree_wrap.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
+        self.course_scroll = ttk.Scrollbar(tree_wrap, orient="vertical")
+        self.course_tree = ttk.Treeview(tree_wrap, columns=("kode", "semester", "stp", "krav"), show="headings", selectmode="extended", yscrollcommand=self._on_course_scroll)
+        self.course_scroll.configure(command=self.course_tree.yview)
         self.course_tree.heading("kode", text="Emnekode")
         self.course_tree.heading("semester", text="Semester")
         self.course_tree.heading("stp", text="Stp")
+        self.course_tree.heading("krav", text="Krav")
         self.course_tree.column("kode", width=160, anchor="w")
         self.course_tree.column("semester", width=90, anchor="center")
         self.course_tree.column("stp", width=60, anchor="e")
-        self.course_tree.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
+        self.course_tree.column("krav", width=120, anchor="w")
+        self.course_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.course_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.course_tree.bind("<<TreeviewSelect>>", lambda e: self._highlight_semesters())
+        self.course_tree.bind("<Double-1>", lambda e: self.open_prerequisites_dialog())
 
         # Right panel (semesters)
         right = ttk.Frame(content)
         right.grid(row=0, column=1, sticky="nsew", padx=(8, 0))
         right.columnconfigure((0, 1, 2), weight=1)
-        right.rowconfigure((0, 1), weight=1)
 
+        self.sem_panel = right
         self.sem_widgets = []  # list of dicts per semester: {frame, tree, progress, label}
-        for i in range(6):
+        self._sem_shape = None  # planformen rutene er bygd for
+        self._highlight_pending = False
+
+        # Status bar
+        self.status = tk.Label(self, text="Klar", anchor="w")
+        self.status.pack(side=tk.BOTTOM, fill=tk.X)
+        self._apply_runtime_colors()
+
+        self.refresh_all()
+
+    @timed("gui.build_semesters")
+    def _build_semesters(self):
+        # Én rute per semester, tre i bredden; bygges på nytt når planformen endres
+        for w in self.sem_widgets:
+            w["frame"].destroy()
+        self.sem_widgets = []
+        shape = self.model.shape
+        self._sem_shape = shape
+        rows = (shape.semesters + 2) // 3
+        for r in range(max(rows, self.sem_panel.grid_size()[1])):
+            self.sem_panel.rowconfigure(r, weight=1 if r < rows else 0)
+        for i in range(shape.semesters):
             r = i // 3
             c = i % 3
-            sem_frame = ttk.Labelframe(right, text=f"Semester {i+1} – {self.model.term_for_semester_index(i)}", style="TLabelframe")
+            sem_frame = ttk.Labelframe(self.sem_panel, text=f"Semester {i+1} – {self.model.term_for_semester_index(i)}", style="TLabelframe")
             sem_frame.grid(row=r, column=c, sticky="nsew", padx=8, pady=8)
             sem_frame.columnconfigure(0, weight=1)
             sem_frame.rowconfigure(0, weight=1)
 
-            tree = ttk.Treeview(sem_frame, columns=("kode", "stp"), show="headings", height=6)
+            tree = ttk.Treeview(sem_frame, columns=("kode", "stp"), show="headings", selectmode="extended", height=6)
             tree.heading("kode", text="Emnekode")
             tree.heading("stp", text="Stp")
             tree.column("kode", anchor="w")
             tree.column("stp", width=60, anchor="e")
             tree.grid(row=0, column=0, sticky="nsew", padx=8, pady=(8, 4))
 
-            pb = ttk.Progressbar(sem_frame, style="Credit.Horizontal.TProgressbar", orient="horizontal", mode="determinate", maximum=30)
+            pb = ttk.Progressbar(sem_frame, style="Credit.Horizontal.TProgressbar", orient="horizontal", mode="determinate", maximum=shape.target)
             pb.grid(row=1, column=0, sticky="ew", padx=8, pady=(0, 4))
 
-            info = ttk.Label(sem_frame, text="0/30 stp", style="Subheader.TLabel")
+            info = ttk.Label(sem_frame, text=f"0/{shape.target} stp", style="Subheader.TLabel")
             info.grid(row=2, column=0, sticky="e", padx=8, pady=(0, 8))
 
             rowf = ttk.Frame(sem_frame, style="Panel.TFrame")
             rowf.grid(row=3, column=0, sticky="ew", padx=8, pady=(0, 8))
-            rowf.columnconfigure((0, 1), weight=1)
+            rowf.columnconfigure((0, 1, 2), weight=1)
             ttk.Button(rowf, text="➖ Fjern valgt", command=lambda idx=i: self.remove_selected_from_semester(idx)).grid(row=0, column=0, sticky="ew", padx=(0, 4))
-            ttk.Button(rowf, text="🧹 Tøm", command=lambda idx=i: self.clear_semester(idx)).grid(row=0, column=1, sticky="ew", padx=(4, 0))
+            ttk.Button(rowf, text="↔ Flytt valgt", command=lambda idx=i: self.move_selected_from_semester(idx)).grid(row=0, column=1, sticky="ew", padx=4)
+            ttk.Button(rowf, text="🧹 Tøm", command=lambda idx=i: self.clear_semester(idx)).grid(row=0, column=2, sticky="ew", padx=(4, 0))
 
             self.sem_widgets.append({"frame": sem_frame, "tree": tree, "progress": pb, "label": info})
 
-        # Status bar
-        self.status = tk.Label(self, text="Klar", anchor="w")
-        self.status.pack(side=tk.BOTTOM, fill=tk.X)
-        self._apply_runtime_colors()
-
-        self.refresh_all()
-
     def _build_menubar(self):
         menubar = tk.Menu(self)
         filemenu = tk.Menu(menubar, tearoff=0)
         filemenu.add_command(label="Ny", command=self.new_file)
+        filemenu.add_command(label="Planform...", command=self.open_shape_dialog)
         filemenu.add_separator()
         filemenu.add_command(label="Åpne...", accelerator="Ctrl+O", command=self.load_from_file)
         filemenu.add_command(label="Lagre", accelerator="Ctrl+S", command=self.save_to_file)
+        filemenu.add_checkbutton(label="Kompakt lagring (uten innrykk)", variable=self.compact_save)
+        filemenu.add_checkbutton(label="Autolagring", variable=self.autosave, command=self._schedule_autosave)
+        filemenu.add_checkbutton(label="Journal-lagring (bare endringer)", variable=self.journal_mode, command=self._toggle_journal)
+        filemenu.add_separator()
+        filemenu.add_command(label="Importer emner...", command=self.import_courses_from_file)
+        filemenu.add_separator()
+        profmenu = tk.Menu(filemenu, tearoff=0)
+        profmenu.add_checkbutton(label="Mål tidsbruk", variable=self.profiling, command=self._toggle_profiling)
+        profmenu.add_command(label="Vis målinger...", command=self.open_profile_panel)
+        profmenu.add_command(label="Eksporter målinger (JSON)...", command=self.export_profile)
+        filemenu.add_cascade(label="Profilering", menu=profmenu)
         filemenu.add_separator()
         filemenu.add_command(label="Avslutt", command=self.on_close)
         menubar.add_cascade(label="Fil", menu=filemenu)
@@ -332,28 +309,158 @@ class App(tk.Tk):
         self.bind_all("<F5>", lambda e: self.validate_plan())
 
     # ----- Data helpers -----
+    @timed("gui.refresh_courses")
     def refresh_courses(self):
+        prefix = self.search_var.get().strip()
+        self._search_hits = self.model.search_courses(prefix) if prefix else None
+        selected = self.course_tree.selection()
         self.course_tree.delete(*self.course_tree.get_children())
-        for c in self.model.courses:
-            self.course_tree.insert("", "end", iid=str(c["id"]), values=(c["kode"], c["semester"], c["stp"]))
+        count = max(COURSE_PAGE, self._courses_shown)
+        self._courses_shown = 0
+        self._load_more_courses(count)
+        # Behold markeringen hvis emnet fortsatt finnes
+        keep = [iid for iid in selected if self.course_tree.exists(iid)]
+        if keep:
+            self.course_tree.selection_set(keep)
+
+    def _on_search(self):
+        self._courses_shown = 0  # start på første side med treff
+        self.refresh_courses()
+
+    def _visible_courses(self):
+        return self.model.courses if self._search_hits is None else self._search_hits
+
+    @timed("gui.load_more_courses")
+    def _load_more_courses(self, count=COURSE_PAGE):
+        self._more_pending = False
+        courses = self._visible_courses()
+        start = self._courses_shown
+        for c in courses[start:start + count]:
+            self.course_tree.insert("", "end", iid=str(c["id"]), values=self._course_row(c))
+        self._courses_shown = min(start + count, len(courses))
+        total = len(courses)
+        if self._search_hits is not None:
+            text = f"Registrerte emner ({total} treff av {len(self.model.courses)})"
+        elif self._courses_shown >= total:
+            text = "Registrerte emner"
+        else:
+            text = f"Registrerte emner (viser {self._courses_shown} av {total})"
+        self.course_count_label.configure(text=text)
+
+    def _course_row(self, c):
+        krav = ", ".join(self.model.get_course(k).kode for k in c.krav)
+        return (c.kode, c.semester, c.stp, krav)
 
+    def _on_course_scroll(self, first, last):
+        self.course_scroll.set(first, last)
+        # Nær bunnen: hent neste side
+        if float(last) > 0.9 and self._courses_shown < len(self._visible_courses()) and not self._more_pending:
+            self._more_pending = True
+            self.after_idle(self._load_more_courses)
+
+    @timed("gui.refresh_semester")
     def refresh_semester(self, idx):
         w = self.sem_widgets[idx]
         tree = w["tree"]
         tree.delete(*tree.get_children())
-        total = 0
         for cid in self.model.plan[idx]:
             c = self.model.get_course(cid)
             if c:
                 tree.insert("", "end", iid=f"{idx}-{cid}", values=(c["kode"], c["stp"]))
-                total += c["stp"]
-        w["progress"]["value"] = total
-        w["label"].configure(text=f"{total}/30 stp")
+        self._update_semester_total(idx)
 
+    @timed("gui.refresh_all")
     def refresh_all(self):
         self.refresh_courses()
-        for i in range(6):
+        if self._sem_shape != self.model.shape:
+            self._build_semesters()
+        for i in range(len(self.sem_widgets)):
             self.refresh_semester(i)
+        self._highlight_semesters()
+
+    def _update_semester_total(self, idx):
+        w = self.sem_widgets[idx]
+        total = self.model.total_credits(idx)
+        w["progress"]["value"] = total
+        w["label"].configure(text=f"{total}/{self.model.shape.target} stp")
+
+    @timed("gui.on_model_event")
+    def _on_model_event(self, event, data):
+        if profile.enabled() and self._idle_probe is None:
+            # Tiden til Tk er ferdig med å tegne og blir ledig igjen
+            self._idle_probe = time.perf_counter()
+            self.after_idle(self._finish_idle_probe)
+        # Oppdater bare radene/semestrene som faktisk er endret
+        if self._search_hits is not None and event in ("course_added", "courses_added", "course_deleted"):
+            self.refresh_courses()  # treffene kan ha endret seg; søket er billig
+        elif event == "course_added":
+            if self._courses_shown == len(self.model.courses) - 1:
+                self._load_more_courses(1)
+            else:
+                self._load_more_courses(0)  # bare teksten "viser x av y"
+        elif event == "courses_added":
+            self._load_more_courses(max(0, COURSE_PAGE - self._courses_shown))
+        elif event == "course_deleted":
+            iid = str(data["course"].id)
+            if self.course_tree.exists(iid):
+                self.course_tree.delete(iid)
+                self._courses_shown -= 1
+            self._load_more_courses(0)
+        elif event == "placed":
+            c = self.model.get_course(data["cid"])
+            idx = data["sem_idx"]
+            self.sem_widgets[idx]["tree"].insert("", "end", iid=f"{idx}-{c.id}", values=(c.kode, c.stp))
+            self._update_semester_total(idx)
+        elif event == "unplaced":
+            idx = data["sem_idx"]
+            tree = self.sem_widgets[idx]["tree"]
+            iid = f"{idx}-{data['cid']}"
+            if tree.exists(iid):
+                tree.delete(iid)
+            self._update_semester_total(idx)
+        elif event == "prerequisites_set":
+            c = data["course"]
+            if self.course_tree.exists(str(c.id)):
+                self.course_tree.item(str(c.id), values=self._course_row(c))
+        elif event == "batch_applied":
+            # Mange flyttinger: tegn hvert berørt semester én gang
+            for idx in sorted({i for _, i in data["removed"]} | {i for _, i in data["placed"]}):
+                self.refresh_semester(idx)
+        elif event == "semester_cleared":
+            idx = data["sem_idx"]
+            tree = self.sem_widgets[idx]["tree"]
+            tree.delete(*tree.get_children())
+            self._update_semester_total(idx)
+        elif event == "loaded":
+            self.refresh_all()
+            return
+        self._schedule_highlight()  # endringen kan ha åpnet eller stengt semestre
+        self._edits += 1
+        self._schedule_autosave()
+
+    def _schedule_highlight(self):
+        # Mange endringer på rad (auto_plan, import) gir én oppdatering når Tk er ledig
+        if not self._highlight_pending:
+            self._highlight_pending = True
+            self.after_idle(self._highlight_semesters)
+
+    @timed("gui.highlight_semesters")
+    def _highlight_semesters(self):
+        # Grønn ramme: emnet kan legges her og planen kan fortsatt fullføres.
+        # Oransje: reglene tillater det, men da kan ikke alle semestre nå stp-målet.
+        # Svarene kommer fra plasseringsindeksen i modellen og regnes ikke ut per klikk.
+        self._highlight_pending = False
+        cid = self.get_selected_course_id()
+        options = self.model.placement_options(cid) if cid is not None else {}
+        for i, w in enumerate(self.sem_widgets):
+            ok = options.get(i)
+            text = f"Semester {i+1} – {self.model.term_for_semester_index(i)}"
+            if ok is None:
+                w["frame"].configure(style="TLabelframe", text=text)
+            elif ok:
+                w["frame"].configure(style="Fits.TLabelframe", text=f"{text} ✓")
+            else:
+                w["frame"].configure(style="Risky.TLabelframe", text=f"{text} ⚠")
 
     def get_selected_course_id(self):
         sel = self.course_tree.selection()
@@ -361,6 +468,13 @@ class App(tk.Tk):
             return None
         return int(sel[0])
 
+    def get_selected_course_ids(self):
+        return [int(iid) for iid in self.course_tree.selection()]
+
+    def _selected_in_semester(self, sem_idx):
+        # Radene i semestertabellene har iid "semesterindeks-id"
+        return [int(iid.split("-")[1]) for iid in self.sem_widgets[sem_idx]["tree"].selection()]
+
     def get_focused_semester_index(self):
         focus_widget = self.focus_get()
         for i, w in enumerate(self.sem_widgets):
@@ -376,7 +490,6 @@ class App(tk.Tk):
         self.title_label.configure(style="Header.TLabel")
         self.subtitle_label.configure(style="Subheader.TLabel")
         self.theme_btn.configure(text="🌙 Mørk" if self.theme == "light" else "☀️ Lys")
-        self.refresh_all()
 
     # ----- Actions -----
     def open_add_course_dialog(self):
@@ -411,14 +524,18 @@ class App(tk.Tk):
         vcmd = (self.register(_validate_stp), '%P')
         ttk.Entry(frm, textvariable=stp_var, validate='key', validatecommand=vcmd).grid(row=2, column=1, sticky="ew", pady=4)
 
+        ttk.Label(frm, text="Krav (emnekoder)").grid(row=3, column=0, sticky="w", pady=4)
+        krav_var = tk.StringVar()
+        ttk.Entry(frm, textvariable=krav_var).grid(row=3, column=1, sticky="ew", pady=4)
+
         btns = ttk.Frame(frm)
-        btns.grid(row=3, column=0, columnspan=2, sticky="e", pady=(12, 0))
+        btns.grid(row=4, column=0, columnspan=2, sticky="e", pady=(12, 0))
         ttk.Button(btns, text="Avbryt", command=dlg.destroy).pack(side=tk.RIGHT, padx=6)
-        ttk.Button(btns, text="Lagre", style="Primary.TButton", command=lambda: self._submit_new_course(dlg, kode_var, sem_var, stp_var)).pack(side=tk.RIGHT)
+        ttk.Button(btns, text="Lagre", style="Primary.TButton", command=lambda: self._submit_new_course(dlg, kode_var, sem_var, stp_var, krav_var)).pack(side=tk.RIGHT)
 
         dlg.wait_window(dlg)
 
-    def _submit_new_course(self, dlg, kode_var, sem_var, stp_var):
+    def _submit_new_course(self, dlg, kode_var, sem_var, stp_var, krav_var):
         try:
             kode = kode_var.get().strip()
             sem = sem_var.get().strip()
@@ -428,8 +545,8 @@ class App(tk.Tk):
             if not stp_str.isdigit():
                 raise ValueError("Studiepoeng må være et heltall (1–30).")
             stp = int(stp_str)
-            self.model.add_course(kode, sem, stp)
-            self.refresh_courses()
+            krav = self.model.ids_for_codes(krav_var.get())
+            self.model.add_course(kode, sem, stp, krav)
             self._set_status("Emne lagt til", kind="success")
             self._dirty = True
             dlg.destroy()
@@ -437,24 +554,96 @@ class App(tk.Tk):
             messagebox.showerror("Kunne ikke opprette emne", str(e), parent=dlg)
             self._set_status(str(e), kind="danger")
 
-    def add_selected_course_to_selected_sem(self):
+    def open_prerequisites_dialog(self):
+        # Dobbeltklikk på et emne: endre kravene (emnekoder skilt med komma)
         cid = self.get_selected_course_id()
-        if not cid:
-            messagebox.showinfo("Velg emne", "Marker et emne i lista først.")
+        c = self.model.get_course(cid) if cid is not None else None
+        if not c:
+            return
+        dlg = tk.Toplevel(self)
+        dlg.title(f"Krav for {c.kode}")
+        dlg.transient(self)
+        dlg.grab_set()
+        frm = ttk.Frame(dlg, style="Panel.TFrame")
+        frm.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
+        ttk.Label(frm, text=f"Emner som må tas før {c.kode}").pack(anchor="w")
+        krav_var = tk.StringVar(value=self._course_row(c)[3])
+        ttk.Entry(frm, textvariable=krav_var, width=40).pack(fill=tk.X, pady=8)
+
+        def submit():
+            try:
+                self.model.set_prerequisites(c.id, self.model.ids_for_codes(krav_var.get()))
+                self._set_status(f"Oppdaterte kravene for {c.kode}", kind="success")
+                self._dirty = True
+                dlg.destroy()
+            except Exception as e:
+                messagebox.showerror("Kunne ikke endre krav", str(e), parent=dlg)
+                self._set_status(str(e), kind="danger")
+
+        ttk.Button(frm, text="Lagre", style="Primary.TButton", command=submit).pack(anchor="e")
+        dlg.wait_window(dlg)
+
+    def open_shape_dialog(self):
+        shape = self.model.shape
+        dlg = tk.Toplevel(self)
+        dlg.title("Planform")
+        dlg.transient(self)
+        dlg.grab_set()
+
+        frm = ttk.Frame(dlg, style="Panel.TFrame")
+        frm.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
+        frm.columnconfigure(1, weight=1)
+
+        ttk.Label(frm, text="Antall semestre").grid(row=0, column=0, sticky="w", pady=4)
+        n_var = tk.StringVar(value=str(shape.semesters))
+        ttk.Spinbox(frm, from_=1, to=24, textvariable=n_var, width=6).grid(row=0, column=1, sticky="w", pady=4)
+
+        ttk.Label(frm, text="Første semester").grid(row=1, column=0, sticky="w", pady=4)
+        first_var = tk.StringVar(value=shape.terms[0])
+        ttk.Combobox(frm, textvariable=first_var, values=list(TERMS), state="readonly").grid(row=1, column=1, sticky="ew", pady=4)
+
+        ttk.Label(frm, text="Stp per semester").grid(row=2, column=0, sticky="w", pady=4)
+        target_var = tk.StringVar(value=str(shape.target))
+        ttk.Entry(frm, textvariable=target_var).grid(row=2, column=1, sticky="ew", pady=4)
+
+        btns = ttk.Frame(frm)
+        btns.grid(row=3, column=0, columnspan=2, sticky="e", pady=(12, 0))
+        ttk.Button(btns, text="Avbryt", command=dlg.destroy).pack(side=tk.RIGHT, padx=6)
+        ttk.Button(btns, text="Bruk", style="Primary.TButton", command=lambda: self._submit_shape(dlg, n_var, first_var, target_var)).pack(side=tk.RIGHT)
+
+        dlg.wait_window(dlg)
+
+    def _submit_shape(self, dlg, n_var, first_var, target_var):
+        try:
+            n, target = n_var.get().strip(), target_var.get().strip()
+            if not n.isdigit() or not target.isdigit():
+                raise ValueError("Antall semestre og stp må være heltall.")
+            self.model.set_shape(PlanShape.alternating(int(n), int(target), first_var.get()))
+            self._set_status(f"Planform: {n} semestre, {target} stp per semester", kind="success")
+            self._dirty = True
+            dlg.destroy()
+        except Exception as e:
+            messagebox.showerror("Kunne ikke endre planform", str(e), parent=dlg)
+            self._set_status(str(e), kind="danger")
+
+    def add_selected_course_to_selected_sem(self):
+        cids = self.get_selected_course_ids()
+        if not cids:
+            messagebox.showinfo("Velg emne", "Marker ett eller flere emner i lista først.")
             return
         sem_idx = self.get_focused_semester_index()
         if sem_idx is None:
             sem_idx = self._ask_semester()
             if sem_idx is None:
                 return
+        # Alle de markerte emnene legges inn samlet, eller ingen av dem
         try:
-            self.model.add_course_to_semester(cid, sem_idx)
-            self.refresh_semester(sem_idx)
-            self._set_status(f"La til emne i semester {sem_idx+1}", kind="success")
+            _, placed = self.model.apply_batch([], [(cid, sem_idx) for cid in cids])
+            self._set_status(f"La til {len(placed)} emne(r) i semester {sem_idx+1}", kind="success")
             self._dirty = True
         except Exception as e:
             messagebox.showerror("Kan ikke legge til emne", str(e))
-            self._set_status(str(e), kind="danger")
+            self._set_status(str(e).splitlines()[0], kind="danger")
 
     def delete_selected_course(self):
         cid = self.get_selected_course_id()
@@ -468,7 +657,6 @@ class App(tk.Tk):
             return
         try:
             self.model.delete_course(cid)
-            self.refresh_all()
             self._set_status(f"Slettet emne {c['kode']}", kind="warning")
             self._dirty = True
         except Exception as e:
@@ -476,99 +664,329 @@ class App(tk.Tk):
             self._set_status(str(e), kind="danger")
 
     def remove_selected_from_semester(self, sem_idx):
-        tree = self.sem_widgets[sem_idx]["tree"]
-        sel = tree.selection()
-        if not sel:
-            return
-        iid = sel[0]
-        try:
-            cid = int(iid.split("-")[1])
-        except Exception:
+        cids = self._selected_in_semester(sem_idx)
+        if not cids:
             return
-        self.model.remove_course_from_semester(cid, sem_idx)
-        self.refresh_semester(sem_idx)
-        self._set_status(f"Fjernet emne fra semester {sem_idx+1}", kind="warning")
+        removed, _ = self.model.apply_batch([(cid, sem_idx) for cid in cids], [])
+        self._set_status(f"Fjernet {len(removed)} emne(r) fra semester {sem_idx+1}", kind="warning")
         self._dirty = True
 
+    def move_selected_from_semester(self, sem_idx):
+        cids = self._selected_in_semester(sem_idx)
+        if not cids:
+            messagebox.showinfo("Velg emne", f"Marker emnene som skal flyttes i semester {sem_idx+1} først.")
+            return
+        target = self._ask_semester(default=sem_idx)
+        if target is None or target == sem_idx:
+            return
+        try:
+            self.model.apply_batch([(cid, sem_idx) for cid in cids], [(cid, target) for cid in cids])
+            self._set_status(f"Flyttet {len(cids)} emne(r) fra semester {sem_idx+1} til {target+1}", kind="success")
+            self._dirty = True
+        except Exception as e:
+            messagebox.showerror("Kan ikke flytte", str(e))
+            self._set_status(str(e).splitlines()[0], kind="danger")
+
     def clear_semester(self, sem_idx):
         if messagebox.askyesno("Tøm semester", f"Vil du fjerne alle emner fra semester {sem_idx+1}?"):
             self.model.clear_semester(sem_idx)
-            self.refresh_semester(sem_idx)
             self._set_status(f"Tømte semester {sem_idx+1}", kind="warning")
             self._dirty = True
 
     def validate_plan(self):
         invalid = self.model.validate_plan()
-        if not invalid:
-            messagebox.showinfo("Gyldig plan", "Alle semestre har 30 stp. Flott!")
+        order = self.model.validate_order()
+        if not invalid and not order:
+            messagebox.showinfo("Gyldig plan", f"Alle semestre har {self.model.shape.target} stp. Flott!")
             self._set_status("Planen er gyldig", kind="success")
         else:
-            lines = [f"- Semester {i+1} ({self.model.term_for_semester_index(i)}): {tot} stp" for i, tot in invalid]
-            messagebox.showwarning("Ugyldig plan", "Disse semestrene er ikke 30 stp:\n" + "\n".join(lines))
+            parts = []
+            if invalid:
+                lines = [f"- Semester {i+1} ({self.model.term_for_semester_index(i)}): {tot} stp" for i, tot in invalid]
+                parts.append(f"Disse semestrene er ikke {self.model.shape.target} stp:\n" + "\n".join(lines))
+            if order:
+                get = self.model.get_course
+                lines = [f"- {get(cid).kode}: {', '.join(get(k).kode for k in krav)}" for cid, krav in order]
+                parts.append("Disse emnene har krav som ikke ligger i et tidligere semester:\n" + "\n".join(lines))
+            messagebox.showwarning("Ugyldig plan", "\n\n".join(parts))
             self._set_status("Planen er ikke gyldig", kind="danger")
 
+    def auto_plan(self):
+        try:
+            placements = self.model.auto_plan()
+        except Exception as e:
+            messagebox.showwarning("Auto-plan", str(e))
+            self._set_status(str(e), kind="danger")
+            return
+        if placements:
+            self._dirty = True
+        self._set_status(f"Auto-plan: la {len(placements)} emner i planen", kind="success")
+
     # ----- Filoperasjoner -----
     def save_to_file(self):
-        path = filedialog.asksaveasfilename(title="Lagre studieplan", defaultextension=".json", filetypes=[("JSON", "*.json"), ("Alle filer", "*.*")])
+        path = filedialog.asksaveasfilename(title="Lagre studieplan", defaultextension=".json", filetypes=PLAN_FILETYPES)
         if not path:
             return
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(self.model.to_json(), f, ensure_ascii=False, indent=2)
-            self._set_status(f"Lagret til {path}", kind="success")
+            compact = self.compact_save.get()
+            if self.journal is not None and self.journal.path == path:
+                secs = self.journal.compact()
+            elif is_sqlite_path(path):
+                self._close_journal()
+                self.journal = SqliteStore(self.model, path)
+                secs = self.journal.start()
+            elif self.journal_mode.get():
+                self._close_journal()
+                self.journal = Journal(self.model, path, compact=compact)
+                secs = self.journal.start()
+            else:
+                self._close_journal()
+                secs = _write_plan(self.model, path, compact)
+            self._set_status(f"Lagret til {path} ({secs:.2f} s)", kind="success")
             self._dirty = False
+            self._saved_edits = self._edits
             self.current_file = path
         except Exception as e:
             messagebox.showerror("Feil ved lagring", str(e))
             self._set_status(str(e), kind="danger")
 
     def load_from_file(self):
-        path = filedialog.askopenfilename(title="Åpne studieplan", filetypes=[("JSON", "*.json"), ("Alle filer", "*.*")])
+        path = filedialog.askopenfilename(title="Åpne studieplan", filetypes=PLAN_FILETYPES)
         if not path:
             return
+        self._close_journal()
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.model.load_json(data)
-            self.refresh_all()
-            self._set_status(f"Lest fra {path}", kind="success")
+            if is_sqlite_path(path):
+                self.journal, secs = SqliteStore.open(self.model, path)
+            elif has_journal(path):
+                self.journal, secs = Journal.open(self.model, path, compact=self.compact_save.get())
+                self.journal_mode.set(True)
+            elif is_catalog_path(path):
+                secs = open_catalog(self.model, path)
+            else:
+                secs = load_plan(self.model, path)
+            note = ", emnene er skrivebeskyttet" if self.model.read_only else ""
+            self._set_status(f"Lest fra {path} ({secs:.2f} s{note})", kind="success")
             self._dirty = False
+            self._saved_edits = self._edits
             self.current_file = path
         except Exception as e:
             messagebox.showerror("Feil ved lesing", str(e))
             self._set_status(str(e), kind="danger")
 
+    def import_courses_from_file(self):
+        path = filedialog.askopenfilename(title="Importer emner", filetypes=[("CSV / JSON Lines", "*.csv *.jsonl *.ndjson"), ("Alle filer", "*.*")])
+        if not path:
+            return
+        try:
+            added, rejected = import_courses(self.model, path)
+        except Exception as e:
+            messagebox.showerror("Feil ved import", str(e))
+            self._set_status(str(e), kind="danger")
+            return
+        if added:
+            self._dirty = True
+        if rejected:
+            lines = [f"- linje {n}: {msg}" for n, msg in rejected[:15]]
+            if len(rejected) > 15:
+                lines.append(f"... og {len(rejected) - 15} til")
+            messagebox.showwarning("Import", f"Importerte {added} emner. {len(rejected)} rader ble avvist:\n" + "\n".join(lines))
+            self._set_status(f"Importerte {added} emner, {len(rejected)} avvist", kind="warning")
+        else:
+            self._set_status(f"Importerte {added} emner", kind="success")
+
+    # ----- Journal -----
+    def _toggle_journal(self):
+        if isinstance(self.journal, SqliteStore):
+            # Databasen får allerede hver endring; valget gjelder neste JSON-fil
+            self._set_status("SQLite-planer lagres alltid endring for endring", kind="info")
+            return
+        if self.journal_mode.get():
+            if self.current_file and self.journal is None:
+                try:
+                    self.journal = Journal(self.model, self.current_file, compact=self.compact_save.get())
+                    self.journal.start()
+                    self._dirty = False
+                    self._saved_edits = self._edits
+                    self._set_status(f"Journalfører endringer til {self.current_file}", kind="info")
+                except Exception as e:
+                    self.journal = None
+                    messagebox.showerror("Feil ved journal", str(e))
+                    self._set_status(str(e), kind="danger")
+        else:
+            self._close_journal()
+
+    def _close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def _has_unsaved(self):
+        # Med journal er hver endring allerede skrevet til disk
+        return self._dirty and self.journal is None
+
+    # ----- Profilering -----
+    def _toggle_profiling(self):
+        if self.profiling.get():
+            profile.enable()
+            self._set_status("Måler tidsbruk (Fil → Profilering → Vis målinger)", kind="info")
+        else:
+            profile.disable()
+            self._set_status("Tidsmåling av", kind="info")
+
+    def _finish_idle_probe(self):
+        profile.record("gui.tk_idle", time.perf_counter() - self._idle_probe)
+        self._idle_probe = None
+
+    def open_profile_panel(self):
+        if self._profile_panel is not None:
+            self._profile_panel.lift()
+            return
+        dlg = tk.Toplevel(self)
+        dlg.title("Profilering")
+        dlg.geometry("900x420")
+        text = tk.Text(dlg, font=("TkFixedFont", 10), wrap="none")
+        text.pack(fill=tk.BOTH, expand=True, padx=8, pady=(8, 4))
+        btns = ttk.Frame(dlg)
+        btns.pack(fill=tk.X, padx=8, pady=(0, 8))
+
+        def update():
+            if self._profile_panel is None:
+                return
+            text.configure(state="normal")
+            text.delete("1.0", tk.END)
+            if not profile.enabled():
+                text.insert(tk.END, "Tidsmåling er av (Fil → Profilering → Mål tidsbruk).\n\n")
+            text.insert(tk.END, "\n".join(profile.format_table()))
+            text.configure(state="disabled")
+            dlg.after(1000, update)
+
+        def close():
+            self._profile_panel = None
+            dlg.destroy()
+
+        ttk.Button(btns, text="Lukk", command=close).pack(side=tk.RIGHT, padx=6)
+        ttk.Button(btns, text="Eksporter...", command=self.export_profile).pack(side=tk.RIGHT, padx=6)
+        ttk.Button(btns, text="Nullstill", command=profile.reset).pack(side=tk.RIGHT, padx=6)
+        dlg.protocol("WM_DELETE_WINDOW", close)
+        self._profile_panel = dlg
+        update()
+
+    def export_profile(self):
+        path = filedialog.asksaveasfilename(title="Eksporter målinger", defaultextension=".json", filetypes=[("JSON", "*.json"), ("Alle filer", "*.*")])
+        if not path:
+            return
+        try:
+            profile.export_json(path)
+            self._set_status(f"Målinger lagret til {path}", kind="success")
+        except Exception as e:
+            messagebox.showerror("Feil ved eksport", str(e))
+            self._set_status(str(e), kind="danger")
+
+    # ----- Autolagring -----
+    def _schedule_autosave(self):
+        if self._autosave_job is not None:
+            self.after_cancel(self._autosave_job)
+            self._autosave_job = None
+        if self.journal is not None:
+            return  # journalen lagrer allerede hver endring
+        if self.autosave.get() and self.current_file and self._edits != self._saved_edits:
+            self._autosave_job = self.after(AUTOSAVE_DELAY_MS, self._autosave)
+
+    def _autosave(self):
+        self._autosave_job = None
+        if self._autosave_thread is not None:
+            # Forrige lagring pågår fortsatt: prøv igjen når den er ferdig
+            self._schedule_autosave()
+            return
+        snap = self.model.snapshot()  # billig kopi; planen kan endres mens den lagres
+        args = (snap, self.current_file, self.compact_save.get(), self._edits)
+        self._autosave_thread = threading.Thread(target=self._autosave_worker, args=args, daemon=True)
+        self._autosave_thread.start()
+        self.after(100, self._poll_autosave)
+
+    def _autosave_worker(self, snap, path, compact, edits):
+        # Kjører i egen tråd: rører ikke Tk, bare legger resultatet fra seg
+        try:
+            self._autosave_result = (edits, _write_plan(snap, path, compact))
+        except Exception as e:
+            self._autosave_result = (edits, e)
+
+    def _poll_autosave(self):
+        if self._autosave_thread is None:
+            return
+        if self._autosave_thread.is_alive():
+            self.after(100, self._poll_autosave)
+            return
+        self._finish_autosave()
+
+    def _finish_autosave(self):
+        self._autosave_thread = None
+        edits, result = self._autosave_result
+        if isinstance(result, Exception):
+            self._set_status(f"Autolagring feilet: {result}", kind="danger")
+            return
+        self._saved_edits = edits
+        if edits == self._edits:
+            self._dirty = False
+        self._set_status(f"Autolagret til {self.current_file} ({result:.2f} s)", kind="info")
+
+    def _flush_autosave(self):
+        # Ved avslutning: vent på tråden og lagre det som eventuelt gjenstår
+        if self._autosave_thread is not None:
+            self._autosave_thread.join()
+            self._finish_autosave()
+        if self._autosave_job is not None:
+            self.after_cancel(self._autosave_job)
+            self._autosave_job = None
+            _write_plan(self.model, self.current_file, self.compact_save.get())
+            self._saved_edits = self._edits
+            self._dirty = False
+
     def new_file(self):
-        if self._dirty:
+        if self._has_unsaved():
             if not messagebox.askyesno("Ny", "Ulagrede endringer vil gå tapt. Fortsette?"):
                 return
+        self._close_journal()
         self.model = Model()
+        self.model.subscribe(self._on_model_event)
         self.refresh_all()
         self._set_status("Ny plan opprettet", kind="info")
         self._dirty = False
+        self._saved_edits = self._edits
         self.current_file = None
 
     def on_close(self):
-        if self._dirty:
+        try:
+            self._flush_autosave()
+        except Exception as e:
+            messagebox.showerror("Feil ved autolagring", str(e))
+        if self._has_unsaved():
             if not messagebox.askyesno("Avslutt", "Du har ulagrede endringer. Avslutte likevel?"):
                 return
+        self._close_journal()
         self.destroy()
 
-    def _ask_semester(self):
+    def _ask_semester(self, default=None):
         dlg = tk.Toplevel(self)
         dlg.title("Velg semester")
         dlg.transient(self)
         dlg.grab_set()
         frm = ttk.Frame(dlg, style="Panel.TFrame")
         frm.pack(fill=tk.BOTH, expand=True, padx=16, pady=16)
-        ttk.Label(frm, text="Velg semester (1–6)").pack(anchor="w")
-        var = tk.IntVar(value=1)
-        cb = ttk.Combobox(frm, textvariable=var, values=[1, 2, 3, 4, 5, 6], state="readonly", width=6)
+        n = self.model.shape.semesters
+        ttk.Label(frm, text=f"Velg semester (1–{n})").pack(anchor="w")
+        # Foreslå første semester som passer (helst ett der planen fortsatt kan fullføres)
+        cid = self.get_selected_course_id() if default is None else None
+        options = self.model.placement_options(cid) if cid is not None else {}
+        best = [i for i, ok in options.items() if ok] or list(options) or [default or 0]
+        var = tk.IntVar(value=best[0] + 1)
+        cb = ttk.Combobox(frm, textvariable=var, values=list(range(1, n + 1)), state="readonly", width=6)
         cb.pack(anchor="w", pady=8)
         ttk.Button(frm, text="OK", command=dlg.destroy, style="Primary.TButton").pack(anchor="e")
         self.wait_window(dlg)
         val = var.get()
-        return val - 1 if 1 <= val <= 6 else None
+        return val - 1 if 1 <= val <= n else None
 
     def _set_status(self, text, kind="info"):
         p = self.palettes[self.theme]
@@ -597,12 +1015,11 @@ class App(tk.Tk):
             self.model.add_course("DAT320", "høst", 10)
             self.model.add_course("MTE200", "høst", 10)
             self.model.add_course("MTE210", "høst", 10)
-
-            self.refresh_all()
         except Exception:
             pass
 
 
 if __name__ == "__main__":
+    profile.enable_from_env()
     app = App()
     app.mainloop()
@@ -0,0 +1,178 @@
+# -----------------------------------------------------
+# Studieplan – validering av mange planfiler på én gang
+# Går gjennom alle *.json i en mappe i en gruppe prosesser (én per kjerne).
+# Planer med de samme emnene deler én emneliste (se shared_catalog), så en
+# bunke holder emnene én gang og bare plasseringene per plan.
+# Hver prosess leser en bunke filer og validerer hele bunken på én gang som en
+# matrise med stp per semester x plan (NumPy hvis det er installert), og
+# skriver én linje per fil til CSV eller JSON Lines etter hvert som bunkene
+# blir ferdige.
+# -----------------------------------------------------
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from studieplan_core import Model
+
+try:
+    import numpy as np
+except ImportError:  # valgfritt: uten NumPy valideres planene én og én
+    np = None
+
+FORMATS = ("csv", "jsonl")
+CSV_FIELDS = ("fil", "status", "emner", "semestre", "rekkefolge", "feil")
+BATCH = 512  # høyst så mange filer per bunke
+
+
+def plan_files(directory):
+    """Alle planfiler (*.json) i directory, sortert. Journal-logger hoppes over."""
+    with os.scandir(directory) as it:
+        return sorted(e.path for e in it if e.is_file() and e.name.lower().endswith(".json"))
+
+
+def validate_plans(models):
+    """Valider mange planer på én gang.
+
+    Gir samme svar som [m.validate_plan() for m in models]: for hver plan en liste
+    med (semesterindeks, stp) for semestrene som ikke har stp-målet. Planer med
+    samme form sjekkes samlet som én matrise (semestre x planer).
+    """
+    if np is None:
+        return [m.validate_plan() for m in models]
+    groups = {}
+    for j, m in enumerate(models):
+        groups.setdefault(m.shape, []).append(j)
+    result = [[] for _ in models]
+    for shape, cols in groups.items():
+        totals = np.array([models[j].credit_totals() for j in cols], dtype=np.int64).T
+        bad = totals != shape.target
+        for k in np.flatnonzero(bad.any(axis=0)):
+            result[cols[k]] = [(int(i), int(totals[i, k])) for i in np.flatnonzero(bad[:, k])]
+    return result
+
+
+def _load(path):
+    # Gir (model, None) eller (None, feilmelding)
+    model = Model()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("Planfila må være et JSON-objekt.")
+        model.load_json(data, shared=True)  # planene i en bunke deler ofte emneliste
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        return None, str(e)
+    return model, None
+
+
+def validate_files(paths):
+    """Valider en bunke planfiler. Gir én dict per fil (se validate_file), i samme rekkefølge."""
+    loaded = [_load(p) for p in paths]
+    models = [m for m, _ in loaded if m is not None]
+    invalid = iter(validate_plans(models))
+    results = []
+    for path, (model, error) in zip(paths, loaded):
+        if model is None:
+            results.append({"fil": path, "status": "feil", "emner": 0, "semestre": [], "rekkefolge": [], "feil": error})
+            continue
+        sems = [(i + 1, model.term_for_semester_index(i), tot) for i, tot in next(invalid)]
+        get = model.get_course
+        order = [(get(cid).kode, [get(k).kode for k in krav]) for cid, krav in model.validate_order()]
+        results.append({
+            "fil": path,
+            "status": "ugyldig" if sems or order else "gyldig",
+            "emner": len(model.courses),
+            "semestre": sems,
+            "rekkefolge": order,
+            "feil": "",
+        })
+    return results
+
+
+def validate_file(path):
+    """Valider én planfil. Gir en dict med fil, status, emner, semestre og feil.
+
+    status er "gyldig", "ugyldig" eller "feil" (fila kunne ikke leses).
+    semestre er [(semesternr, årstid, stp), ...] for semestrene som ikke har stp-målet.
+    rekkefolge er [(emnekode, [krav som ikke ligger i et tidligere semester]), ...].
+    """
+    return validate_files([path])[0]
+
+
+class _Writer:
+    # Skriver resultatene fortløpende i valgt format
+    def __init__(self, f, fmt):
+        self.f = f
+        if fmt == "csv":
+            self._csv = csv.writer(f)
+            self._csv.writerow(CSV_FIELDS)
+            self.write = self._write_csv
+        else:
+            self.write = self._write_jsonl
+
+    def _write_csv(self, r):
+        sems = ";".join(f"{nr}:{tot}" for nr, _, tot in r["semestre"])
+        order = ";".join(f"{kode}:{'+'.join(krav)}" for kode, krav in r["rekkefolge"])
+        self._csv.writerow((r["fil"], r["status"], r["emner"], sems, order, r["feil"]))
+
+    def _write_jsonl(self, r):
+        rec = dict(r, semestre=[{"semester": nr, "arstid": term, "stp": tot} for nr, term, tot in r["semestre"]],
+                   rekkefolge=[{"emne": kode, "krav": krav} for kode, krav in r["rekkefolge"]])
+        self.f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+def validate_directory(directory, out, fmt="csv", workers=None):
+    """Valider alle planfiler i directory og skriv resultatene til out (filobjekt).
+
+    workers er antall prosesser (default: antall kjerner). Resultatene skrives i
+    den rekkefølgen de blir ferdige. Returnerer {"gyldig": n, "ugyldig": n,
+    "feil": n, "sekunder": s}.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Ukjent format: {fmt!r} (bruk csv eller jsonl).")
+    t0 = time.perf_counter()
+    paths = plan_files(directory)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths) or 1))
+    writer = _Writer(out, fmt)
+    counts = {"gyldig": 0, "ugyldig": 0, "feil": 0}
+
+    def consume(batches):
+        for results in batches:
+            for r in results:
+                counts[r["status"]] += 1
+                writer.write(r)
+
+    # Store bunker gir lite overhead og store matriser; nok bunker til at alle kjernene holdes i arbeid
+    size = max(1, min(BATCH, len(paths) // (workers * 8)))
+    batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+    if workers == 1:
+        consume(map(validate_files, batches))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            consume(pool.imap_unordered(validate_files, batches))
+    out.flush()
+    counts["sekunder"] = time.perf_counter() - t0
+    return counts
+
+
+def validate_command(directory, out_path=None, fmt=None, workers=None):
+    """Kommandolinje: valider en mappe og skriv til out_path (eller stdout)."""
+    if fmt is None:
+        fmt = "jsonl" if out_path and out_path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    try:
+        if out_path and out_path != "-":
+            with open(out_path, "w", encoding="utf-8", newline="") as f:
+                counts = validate_directory(directory, f, fmt, workers)
+        else:
+            counts = validate_directory(directory, sys.stdout, fmt, workers)
+    except (OSError, ValueError) as e:
+        print("❌", e, file=sys.stderr)
+        return 1
+    total = counts["gyldig"] + counts["ugyldig"] + counts["feil"]
+    print(f"✅ Validerte {total} planer på {counts['sekunder']:.2f} s: "
+          f"{counts['gyldig']} gyldige, {counts['ugyldig']} ugyldige, {counts['feil']} med feil.",
+          file=sys.stderr)
+    return 0
@@ -0,0 +1,184 @@
+# -----------------------------------------------------
+# Studieplan – ytelsestester (benchmark)
+# Lager syntetiske kataloger (100 til 1 000 000 emner) og måler hver
+# Model-operasjon og lagring/innlasting. Skriver en tabell med tid per
+# operasjon og et stigningstall (≈0: konstant tid, ≈1: lineær), og kan
+# lagre resultatene som JSON for sammenligning mellom versjoner:
+#
+#   python studieplan_bench.py --out ny.json --compare gammel.json
+# -----------------------------------------------------
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from studieplan_core import Model
+from studieplan_io import load_plan, save_plan
+
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+QUICK_SIZES = [100, 1_000, 10_000]
+STP_VALUES = [5, 10, 15]
+REPEAT = 1000  # kall per måling for operasjoner som ikke vokser med katalogen
+
+
+def make_catalog(n, seed=1):
+    """Model med n emner og en delvis fylt plan. Samme seed gir samme katalog."""
+    rng = random.Random(seed)
+    model = Model()
+    for i in range(n):
+        model.add_course(f"K{i:07d}", "høst" if i % 2 == 0 else "vår", rng.choice(STP_VALUES))
+    # Fyll hvert semester til 20 stp, så det er plass til én til
+    for sem in range(model.shape.semesters):
+        term = model.term_for_semester_index(sem)
+        for c in model.courses:
+            if model.total_credits(sem) >= 20:
+                break
+            if c.semester == term and not model.course_in_plan(c.id) and model.total_credits(sem) + c.stp <= 20:
+                model.add_course_to_semester(c.id, sem)
+    return model
+
+
+def make_catalog_courses(n):
+    """Bare emner, ingen plan – brukes til å måle add_course."""
+    model = Model()
+    for i in range(n):
+        model.add_course(f"K{i:07d}", "høst", 10)
+    return model
+
+
+def _timed(fn, calls=1):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) / calls
+
+
+def bench_size(n, tmpdir, seed=1):
+    """Mål alle operasjoner for én katalogstørrelse. Gir {operasjon: sekunder per kall}."""
+    res = {}
+    res["add_course"] = _timed(lambda: make_catalog_courses(n), n)
+    model = make_catalog(n, seed)
+
+    free = next(c for c in model.courses if c.semester == "høst" and c.stp == 10 and not model.course_in_plan(c.id))
+
+    def place_remove():
+        for _ in range(REPEAT):
+            model.add_course_to_semester(free.id, 0)
+            model.remove_course_from_semester(free.id, 0)
+    res["add_course_to_semester"] = _timed(place_remove, REPEAT)
+    res["total_credits"] = _timed(lambda: [model.total_credits(i % 6) for i in range(REPEAT)], REPEAT)
+    res["validate_plan"] = _timed(lambda: [model.validate_plan() for _ in range(REPEAT)], REPEAT)
+
+    victims = [c.id for c in model.courses[-min(100, n // 2):]]
+    res["delete_course"] = _timed(lambda: [model.delete_course(cid) for cid in victims], len(victims))
+
+    data = model.to_json()
+    res["to_json"] = _timed(model.to_json)
+    res["load_json"] = _timed(lambda: Model().load_json(data))
+
+    path = os.path.join(tmpdir, f"plan_{n}.json")
+    res["save_plan"] = _timed(lambda: save_plan(model, path))
+    res["load_plan"] = _timed(lambda: load_plan(Model(), path))
+    res["save_plan_compact"] = _timed(lambda: save_plan(model, path, compact=True))
+    res["load_plan_compact"] = _timed(lambda: load_plan(Model(), path))
+    return res
+
+
+def _git_rev():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(sizes, seed=1, progress=print):
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n in sizes:
+            progress(f"… {n} emner")
+            for op, secs in bench_size(n, tmpdir, seed).items():
+                results.append({"op": op, "n": n, "seconds_per_op": secs})
+    return {
+        "meta": {
+            "git": _git_rev(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _fmt(secs):
+    if secs < 1e-3:
+        return f"{secs * 1e6:9.2f} µs"
+    if secs < 1:
+        return f"{secs * 1e3:9.2f} ms"
+    return f"{secs:9.2f} s "
+
+
+def slope(points):
+    """Stigningstall i log-log mellom minste og største n (0 ≈ O(1), 1 ≈ O(n))."""
+    (n0, t0), (n1, t1) = points[0], points[-1]
+    if n0 == n1 or t0 <= 0 or t1 <= 0:
+        return None
+    return math.log(t1 / t0) / math.log(n1 / n0)
+
+
+def report(data, baseline=None):
+    by_op = {}
+    for r in data["results"]:
+        by_op.setdefault(r["op"], []).append((r["n"], r["seconds_per_op"]))
+    base = {}
+    if baseline:
+        base = {(r["op"], r["n"]): r["seconds_per_op"] for r in baseline["results"]}
+    sizes = sorted({r["n"] for r in data["results"]})
+    print(f"\n{'operasjon':<24}" + "".join(f"{n:>14}" for n in sizes) + "   stigning")
+    for op, points in by_op.items():
+        points.sort()
+        cells = []
+        for n in sizes:
+            t = dict(points).get(n)
+            cell = _fmt(t) if t is not None else ""
+            if t is not None and (op, n) in base and base[(op, n)] > 0:
+                cell = f"{t / base[(op, n)]:.2f}x"
+            cells.append(f"{cell:>14}")
+        s = slope(points)
+        print(f"{op:<24}" + "".join(cells) + (f"   {s:6.2f}" if s is not None else ""))
+    if baseline:
+        print(f"\n(tall i tabellen er tid i forhold til {baseline['meta'].get('git') or 'grunnlinjen'}; <1 er raskere)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mål ytelsen til Model og lagring for ulike katalogstørrelser.")
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=SIZES,
+                        help="kommaseparerte katalogstørrelser (default: 100,...,1000000)")
+    parser.add_argument("--quick", action="store_true", help="bare 100, 1000 og 10000 emner")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="skriv resultatene som JSON hit")
+    parser.add_argument("--compare", help="sammenlign med en tidligere JSON-fil")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else args.sizes
+    data = run(sizes, args.seed, progress=lambda msg: print(msg, file=sys.stderr))
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(data, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+# -----------------------------------------------------
+# Studieplan – binær emnekatalog (.spcat)
+# For svært store kataloger: fila mappes rett i minnet (mmap), og emnene leses
+# først når noen ber om dem. Å åpne en katalog med en million emner tar derfor
+# like kort tid som å åpne en med ti.
+#
+# Oppbygning (alle tall little-endian):
+#   header     magic, versjon, antall, next_id og hvor de andre delene starter
+#   records    én post à 12 byte per emne, sortert på id:
+#              id (u32), kodeoffset (u32), kodelengde (u16), årstid (u8), stp (u8)
+#   order      postnumrene (u32) sortert på kode.lower(), for oppslag og prefikssøk
+#   strings    alle emnekodene etter hverandre (UTF-8)
+#   meta       JSON med plan, planform og krav ({id: [krav-id-er]}, bare emner med krav)
+#
+# Modellen bruker katalogen skrivebeskyttet (Model.attach_catalog): emnene
+# ligger i fila, mens plasseringene i planen holdes i minnet som vanlig.
+# -----------------------------------------------------
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from studieplan_core import DEFAULT_SHAPE, TERMS, Course, PlanShape
+from studieplan_profile import timed
+
+SUFFIX = ".spcat"
+MAGIC = b"SPCAT\0\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQQQ")  # magic, versjon, antall, next_id, records, order, strings, meta, metalengde
+RECORD = struct.Struct("<IIHBB")
+
+
+def is_catalog_path(path):
+    return path.lower().endswith(SUFFIX)
+
+
+class _IdView:
+    # Oppslag på id, med samme grensesnitt som dict-indeksen i Model
+    __slots__ = ("_cat",)
+
+    def __init__(self, cat):
+        self._cat = cat
+
+    def get(self, cid, default=None):
+        i = self._cat.index_of_id(cid)
+        return default if i is None else self._cat[i]
+
+    def __contains__(self, cid):
+        return self._cat.index_of_id(cid) is not None
+
+    def __getitem__(self, cid):
+        c = self.get(cid)
+        if c is None:
+            raise KeyError(cid)
+        return c
+
+
+class _CodeView:
+    # Oppslag på kode.lower()
+    __slots__ = ("_cat",)
+
+    def __init__(self, cat):
+        self._cat = cat
+
+    def get(self, key, default=None):
+        i = self._cat.index_of_code(key)
+        return default if i is None else self._cat[i]
+
+    def __contains__(self, key):
+        return self._cat.index_of_code(key) is not None
+
+    def __getitem__(self, key):
+        c = self.get(key)
+        if c is None:
+            raise KeyError(key)
+        return c
+
+
+class MappedCatalog:
+    """Skrivebeskyttet emnekatalog lest direkte fra en minnemappet .spcat-fil.
+
+    Oppfører seg som en liste med Course (len, indeks, slicing, iterasjon), men
+    lager bare Course-objekter for postene som faktisk leses.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path} er ikke en emnekatalog.")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self._count, self.next_id, self._rec, self._order,
+             self._str, meta_off, meta_len) = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} er ikke en emnekatalog.")
+            if version != VERSION:
+                raise ValueError(f"{path} har ukjent katalogversjon {version}.")
+            if meta_off + meta_len > size or self._rec + self._count * RECORD.size > size:
+                raise ValueError(f"{path} er avkortet eller ødelagt.")
+            self.meta = json.loads(self._mm[meta_off:meta_off + meta_len].decode("utf-8"))
+            self._krav = {int(cid): tuple(krav) for cid, krav in self.meta.get("krav", {}).items()}
+            # Kravgrafen for Model (som i SharedCatalog): kravene endres aldri
+            self.bit_ids = list(dict.fromkeys(k for krav in self._krav.values() for k in krav))
+            self.bits = {cid: b for b, cid in enumerate(self.bit_ids)}
+            self.closure = {}
+        except Exception:
+            self._mm.close()
+            raise
+        self.by_id = _IdView(self)
+        self.by_code = _CodeView(self)
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self._count
+
+    def _course(self, i):
+        cid, off, n, term, stp = RECORD.unpack_from(self._mm, self._rec + i * RECORD.size)
+        start = self._str + off
+        return Course(cid, self._mm[start:start + n].decode("utf-8"), TERMS[term], stp, self._krav.get(cid, ()))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._course(j) for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._course(i)
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._course(i)
+
+    def _id_at(self, i):
+        return struct.unpack_from("<I", self._mm, self._rec + i * RECORD.size)[0]
+
+    def _key_at(self, k):
+        # kode.lower() for post nummer k i kode-rekkefølgen, og postnummeret
+        i = struct.unpack_from("<I", self._mm, self._order + 4 * k)[0]
+        _, off, n, _, _ = RECORD.unpack_from(self._mm, self._rec + i * RECORD.size)
+        start = self._str + off
+        return self._mm[start:start + n].decode("utf-8").lower(), i
+
+    def index_of_id(self, cid):
+        """Postnummeret for emnet med id cid (binærsøk), eller None."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._id_at(mid) < cid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self._count and self._id_at(lo) == cid else None
+
+    def _lower_bound(self, key, lo=0):
+        hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def index_of_code(self, key):
+        """Postnummeret for emnet med kode.lower() == key, eller None."""
+        k = self._lower_bound(key)
+        if k < self._count:
+            found, i = self._key_at(k)
+            if found == key:
+                return i
+        return None
+
+    def search(self, prefix):
+        """Emner der koden starter med prefix, sortert på kode (som Model.search_courses)."""
+        key = prefix.strip().lower()
+        lo = self._lower_bound(key)
+        hi = self._lower_bound(key + "\U0010ffff", lo)
+        return [self._course(self._key_at(k)[1]) for k in range(lo, hi)]
+
+
+@timed("catalog.save")
+def save_catalog(model, path):
+    """Skriv emnene og planen i model (eller et PlanSnapshot) som .spcat, atomisk. Returnerer sekunder."""
+    t0 = time.perf_counter()
+    courses = sorted(model.courses, key=lambda c: c.id)
+    codes = [c.kode.encode("utf-8") for c in courses]
+    order = array("I", sorted(range(len(courses)), key=lambda i: courses[i].kode.lower()))
+    if sys.byteorder != "little":
+        order.byteswap()
+    shape = model.shape
+    meta = {"plan": model.plan}
+    if shape != DEFAULT_SHAPE:
+        meta["shape"] = shape.to_dict()
+    krav = {str(c.id): list(c.krav) for c in courses if c.krav}
+    if krav:
+        meta["krav"] = krav
+    meta_bytes = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    rec_off = HEADER.size
+    order_off = rec_off + len(courses) * RECORD.size
+    str_off = order_off + 4 * len(courses)
+    str_len = sum(len(b) for b in codes)
+    meta_off = str_off + str_len
+    fd, tmp = tempfile.mkstemp(prefix=".studieplan-", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(courses), model.next_id, rec_off, order_off,
+                                str_off, meta_off, len(meta_bytes)))
+            pack = RECORD.pack
+            off = 0
+            buf = bytearray()
+            for c, b in zip(courses, codes):
+                buf += pack(c.id, off, len(b), TERMS.index(c.semester), c.stp)
+                off += len(b)
+            f.write(buf)
+            f.write(order.tobytes())
+            f.write(b"".join(codes))
+            f.write(meta_bytes)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return time.perf_counter() - t0
+
+
+@timed("catalog.open")
+def open_catalog(model, path):
+    """Koble model til katalogen i path (skrivebeskyttet). Returnerer sekunder."""
+    t0 = time.perf_counter()
+    catalog = MappedCatalog(path)
+    try:
+        shape = PlanShape.from_dict(catalog.meta.get("shape"))
+        model.attach_catalog(catalog, catalog.meta.get("plan"), shape)
+    except Exception:
+        catalog.close()
+        raise
+    return time.perf_counter() - t0
+
+
+def load_catalog(model, path):
+    """Les hele katalogen inn i model som vanlige, redigerbare emner. Returnerer sekunder."""
+    t0 = time.perf_counter()
+    catalog = MappedCatalog(path)
+    try:
+        shape = PlanShape.from_dict(catalog.meta.get("shape"))
+        courses = list(catalog)
+    finally:
+        catalog.close()
+    model.load_parsed(catalog.next_id, courses, catalog.meta.get("plan"), shape)
+    return time.perf_counter() - t0
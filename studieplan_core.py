@@ -0,0 +1,1161 @@
+# -----------------------------------------------------
+# Studieplan – felles kjerne (modell og regler)
+# Standard: 6 semestre, 30 stp per semester,
+#   høst: sem 1/3/5, vår: sem 2/4/6, emner kan kun legges én gang
+# Antall semestre, årstid per semester og stp-mål kan endres per plan (PlanShape).
+# Emner kan ha krav (forkunnskaper): id-ene til emner som må ligge i et
+# tidligere semester. validate_order sjekker rekkefølgen.
+# Model kan brukes fra flere tråder: endringer tar en skrivelås, og andre
+# tråder leser via snapshot() (se RWLock og PlanSnapshot).
+# Mange planer med samme emner kan dele én emneliste (se shared_catalog).
+# Brukes av både terminal- og GUI-versjonen. Modulen skal ikke importere
+# tkinter (eller annet tungt) når den lastes, så skript og batchjobber
+# starter raskt. Se README for importtidsbudsjettet.
+# -----------------------------------------------------
+import sys
+import threading
+import weakref
+from bisect import bisect_left, insort
+from functools import wraps
+
+
+class Course:
+    """Ett emne. Bruker __slots__ i stedet for dict for å spare minne i store
+    kataloger (ca. 165 mot 350 byte per emne, målt med tracemalloc på 200 000
+    emner lest fra JSON). Støtter fortsatt c["kode"] slik at eldre kode virker.
+
+    krav er en tuppel med id-ene til emnene som må tas før dette. Emner endres
+    ikke etter at de er laget (snapshots deler dem); Model bytter dem ut."""
+    __slots__ = ("id", "kode", "semester", "stp", "krav")
+
+    def __init__(self, cid, kode, semester, stp, krav=()):
+        self.id = cid
+        self.kode = kode
+        self.semester = sys.intern(semester)  # bare "høst"/"vår": del strengene
+        self.stp = stp
+        self.krav = krav
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self):
+        d = {"id": self.id, "kode": self.kode, "semester": self.semester, "stp": self.stp}
+        if self.krav:
+            d["krav"] = list(self.krav)  # utelates uten krav, som i eldre filer
+        return d
+
+    def __repr__(self):
+        krav = f", {self.krav!r}" if self.krav else ""
+        return f"Course({self.id!r}, {self.kode!r}, {self.semester!r}, {self.stp!r}{krav})"
+
+
+TERMS = ("høst", "vår")
+MAX_STP = 30  # største emne (stp), uansett planform
+
+
+class PlanShape:
+    """Formen på en plan: årstiden for hvert semester og stp-målet per semester.
+
+    PlanShape() er bachelor: 6 semestre fra høst, 30 stp. Master er
+    PlanShape.alternating(4), deltid f.eks. PlanShape.alternating(12, target=15).
+    """
+    __slots__ = ("terms", "target")
+
+    def __init__(self, terms=TERMS * 3, target=30):
+        terms = tuple(terms)
+        if not terms or any(t not in TERMS for t in terms):
+            raise ValueError("Planformen må ha minst ett semester, og hvert semester må være 'høst' eller 'vår'.")
+        if not isinstance(target, int) or target < 1:
+            raise ValueError("Stp-målet per semester må være et positivt heltall.")
+        self.terms = tuple(sys.intern(t) for t in terms)
+        self.target = target
+
+    @classmethod
+    def alternating(cls, semesters, target=30, first="høst"):
+        """semesters semestre som veksler mellom høst og vår, fra first."""
+        if first not in TERMS:
+            raise ValueError("Første semester må være 'høst' eller 'vår'.")
+        start = TERMS.index(first)
+        return cls([TERMS[(start + i) % 2] for i in range(semesters)], target)
+
+    @property
+    def semesters(self):
+        return len(self.terms)
+
+    def allowed(self, term):
+        """Semesternumrene (fra 1) der emner fra årstiden term kan ligge, som tekst: "1/3/5"."""
+        return "/".join(str(i + 1) for i, t in enumerate(self.terms) if t == term)
+
+    def to_dict(self):
+        return {"terms": list(self.terms), "target": self.target}
+
+    @classmethod
+    def from_dict(cls, raw):
+        """Tolk planformen fra fil. None (eldre filer) gir standardformen."""
+        if raw is None:
+            return DEFAULT_SHAPE
+        try:
+            return cls(raw["terms"], int(raw.get("target", 30)))
+        except (TypeError, KeyError, AttributeError):
+            raise ValueError("Ugyldig planform i fila.") from None
+
+    def __eq__(self, other):
+        return isinstance(other, PlanShape) and self.terms == other.terms and self.target == other.target
+
+    def __hash__(self):
+        return hash((self.terms, self.target))
+
+    def __repr__(self):
+        return f"PlanShape({list(self.terms)!r}, {self.target!r})"
+
+
+DEFAULT_SHAPE = PlanShape()
+
+
+class RWLock:
+    """Mange lesere eller én skriver. Skriveren kan ta låsen på nytt (også for
+    lesing) i samme tråd, så endringer kan kalle andre endringer. En leser må
+    ikke ta låsen på nytt: venter en skriver, blir det vranglås."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None  # tråd-id til skriveren
+        self._depth = 0
+        self._writers_waiting = 0  # skrivere går foran nye lesere
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+                return
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._depth -= 1
+                return
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._depth += 1
+                return
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._depth = 1
+
+    def release_write(self):
+        with self._cond:
+            self._depth -= 1
+            if not self._depth:
+                self._writer = None
+                self._cond.notify_all()
+
+
+def _writes(fn):
+    # Metoden endrer modellen: hold skrivelåsen mens den kjører
+    @wraps(fn)
+    def locked(self, *args, **kwargs):
+        lock = self._lock
+        lock.acquire_write()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            lock.release_write()
+    return locked
+
+
+def _reads(fn):
+    # Metoden leser flere felt som må stemme med hverandre: hold leselåsen
+    @wraps(fn)
+    def locked(self, *args, **kwargs):
+        lock = self._lock
+        lock.acquire_read()
+        try:
+            return fn(self, *args, **kwargs)
+        finally:
+            lock.release_read()
+    return locked
+
+
+class PlanSnapshot:
+    """Frossen, konsistent kopi av en plan (se Model.snapshot).
+
+    Kan leses, valideres og lagres fra en annen tråd mens modellen endres.
+    Emnelista deles med modellen til neste endring (kopi ved skriving), så
+    kopien er billig selv for store planer.
+    """
+    __slots__ = ("next_id", "courses", "plan", "shape", "totals")
+
+    def __init__(self, next_id, courses, plan, shape, totals):
+        self.next_id = next_id
+        self.courses = courses
+        self.plan = plan
+        self.shape = shape
+        self.totals = totals
+
+    def credit_totals(self):
+        return list(self.totals)
+
+    def validate_plan(self):
+        target = self.shape.target
+        return [(i, tot) for i, tot in enumerate(self.totals) if tot != target]
+
+    def to_json(self):
+        data = {"next_id": self.next_id, "courses": [c.to_dict() for c in self.courses], "plan": self.plan}
+        if self.shape != DEFAULT_SHAPE:
+            data["shape"] = self.shape.to_dict()  # eldre filer uten "shape" er standardformen
+        return data
+
+
+def _clean_courses(courses):
+    # Kast emner med duplikat kode eller id (det første beholdes), og ugyldige krav
+    kept = []
+    seen_codes = set()
+    seen_ids = set()
+    for c in courses:
+        if c.kode.lower() in seen_codes or c.id in seen_ids:
+            continue
+        kept.append(c)
+        seen_codes.add(c.kode.lower())
+        seen_ids.add(c.id)
+    return _clean_krav(kept, seen_ids)
+
+
+def _clean_krav(courses, ids):
+    """Kast krav til emner som ikke finnes, og bryt sirkler (fra fil). Endrer
+    lista: emner med endrede krav byttes ut."""
+    index = {c.id: i for i, c in enumerate(courses)}
+    for i, c in enumerate(courses):
+        if c.krav:
+            krav = tuple(dict.fromkeys(k for k in c.krav if k in ids and k != c.id))
+            if krav != c.krav:
+                courses[i] = Course(c.id, c.kode, c.semester, c.stp, krav)
+    # Dybde-først-søk; et krav tilbake til et emne vi står i, lager en sirkel
+    done, active = set(), set()
+    for start in courses:
+        if not start.krav or start.id in done:
+            continue
+        stack = [(start.id, 0)]
+        active.add(start.id)
+        while stack:
+            cid, n = stack[-1]
+            c = courses[index[cid]]
+            if n == len(c.krav):
+                stack.pop()
+                active.discard(cid)
+                done.add(cid)
+                continue
+            stack[-1] = (cid, n + 1)
+            k = c.krav[n]
+            if k in active:
+                courses[index[cid]] = Course(c.id, c.kode, c.semester, c.stp, c.krav[:n] + c.krav[n + 1:])
+                stack[-1] = (cid, n)  # samme posisjon peker nå på neste krav
+            elif k not in done:
+                active.add(k)
+                stack.append((k, 0))
+    return courses
+
+
+class SharedCatalog:
+    """Frossen emneliste som deles av alle planer med de samme emnene.
+
+    Lages med shared_catalog og brukes som en skrivebeskyttet katalog
+    (Model.attach_catalog), med samme grensesnitt som MappedCatalog. Indeksene
+    og tillukningen av kravene (se Model.validate_order) ligger her, én gang,
+    så hver plan bare holder sine egne plasseringer.
+    """
+    __slots__ = ("key", "next_id", "_courses", "by_id", "by_code", "_sorted_codes",
+                 "bits", "bit_ids", "closure", "__weakref__")
+
+    def __init__(self, key, next_id, courses):
+        self.key = key  # sha256 av innholdet (se shared_catalog)
+        self.next_id = next_id
+        self._courses = tuple(courses)
+        self.by_id = {c.id: c for c in courses}
+        self.by_code = {c.kode.lower(): c for c in courses}
+        self._sorted_codes = None  # bygges ved første søk
+        # Kravene endres aldri, så bitnumrene deles ut med en gang. Da kan
+        # planer i flere tråder fylle closure samtidig uten å endre bits.
+        self.bit_ids = list(dict.fromkeys(k for c in courses for k in c.krav))
+        self.bits = {cid: b for b, cid in enumerate(self.bit_ids)}
+        self.closure = {}
+
+    def __len__(self):
+        return len(self._courses)
+
+    def __getitem__(self, i):
+        return self._courses[i]
+
+    def __iter__(self):
+        return iter(self._courses)
+
+    def search(self, prefix):
+        """Emner der koden starter med prefix, sortert på kode (som Model.search_courses)."""
+        if self._sorted_codes is None:
+            self._sorted_codes = sorted(self.by_code)
+        key = prefix.strip().lower()
+        codes = self._sorted_codes
+        lo = bisect_left(codes, key)
+        hi = bisect_left(codes, key + "\U0010ffff", lo)
+        by_code = self.by_code
+        return [by_code[k] for k in codes[lo:hi]]
+
+
+_shared = {}  # innholdsnøkkel -> svak referanse til SharedCatalog
+_shared_lock = threading.Lock()
+
+
+def shared_catalog(next_id, courses):
+    """Felles SharedCatalog for next_id og emnene courses (se Model.parse_course).
+
+    Katalogene huskes på en sha256 av innholdet, så alle planer med de samme
+    emnene får samme objekt. En katalog glemmes når ingen plan bruker den lenger.
+    """
+    from hashlib import sha256  # importeres først når den trengs
+    try:
+        next_id = int(next_id)
+    except Exception:
+        next_id = 1
+    # Nøkkelen regnes av emnene slik de kom fra fila, så opprydningen
+    # (duplikater, krav) bare gjøres første gang
+    courses = list(courses)
+    h = sha256(repr(next_id).encode())
+    for c in courses:
+        h.update(repr((c.id, c.kode, c.semester, c.stp, c.krav)).encode("utf-8"))
+    key = h.hexdigest()
+    with _shared_lock:
+        catalog = _shared[key]() if key in _shared else None
+        if catalog is None:
+            catalog = SharedCatalog(key, next_id, _clean_courses(courses))
+            _shared[key] = weakref.ref(catalog, lambda _, key=key: _forget_shared(key))
+    return catalog
+
+
+def _forget_shared(key):
+    with _shared_lock:
+        r = _shared.get(key)
+        if r is not None and r() is None:  # ikke en nyere katalog med samme nøkkel
+            del _shared[key]
+
+
+class PlanBatch:
+    """Flyttinger i planen som samles opp og tas i bruk samlet (se Model.batch).
+
+    Ingenting endres før commit(). Reglene sjekkes én gang mot planen slik den
+    blir til slutt, og enten tas alle endringene i bruk eller ingen.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.removals = []    # (id, semesterindeks eller None = der emnet ligger)
+        self.placements = []  # (id, semesterindeks)
+
+    def remove(self, cid, sem_idx=None):
+        self.removals.append((cid, sem_idx))
+        return self
+
+    def place(self, cid, sem_idx):
+        self.placements.append((cid, sem_idx))
+        return self
+
+    def move(self, cid, sem_idx):
+        """Flytt emnet til sem_idx, eller legg det inn hvis det ikke er i planen."""
+        return self.remove(cid).place(cid, sem_idx)
+
+    def commit(self):
+        """Ta i bruk alle endringene (se Model.apply_batch) og tøm bunken."""
+        removals, placements = self.removals, self.placements
+        self.removals, self.placements = [], []
+        return self.model.apply_batch(removals, placements)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()  # et unntak i with-blokken forkaster bunken
+
+
+class Model:
+    def __init__(self, self_check=False, shape=DEFAULT_SHAPE):
+        self.courses = []  # Course(id, kode, semester, stp, krav)
+        self._next_id = 1
+        self.shape = shape
+        self.plan = [[] for _ in range(shape.semesters)]  # holder course_id per semester
+        # Oppslagsindekser (holdes i takt med courses/plan)
+        self._by_id = {}      # id -> emne
+        self._by_code = {}    # kode.lower() -> emne
+        self._placement = {}  # id -> semesterindeks
+        self._totals = [0] * shape.semesters  # løpende sum stp per semester
+        self._sorted_codes = None  # sorterte kode.lower() for prefikssøk; bygges ved første søk
+        self._catalog = None  # MappedCatalog når emnene leses fra en .spcat-fil (skrivebeskyttet)
+        # Plasseringsindeks (se placement_options): antall emner utenfor planen per
+        # årstid og stp, og svar som er regnet ut siden siste endring i årstiden
+        self._free = None      # årstid -> {stp: antall}; bygges ved første spørsmål
+        self._feasible = {}    # årstid -> {(stp, semesterindeks): planen kan fullføres}
+        # Kravgrafen (se validate_order). Bitsettene bruker egne bitnumre, og bare
+        # emner som er krav for noe får et nummer, så settene holder seg små.
+        self._bits = {}          # id -> bitnummer
+        self._bit_ids = []       # bitnummer -> id
+        self._closure = {}       # id -> bitsett med alle krav, også indirekte
+        self._dependents = None  # id -> {id-ene som har emnet som krav}; bygges ved behov
+        self._order = None       # svaret fra validate_order til neste endring
+        self._lock = RWLock()
+        self._courses_shared = False  # courses er delt med et snapshot: kopier før endring
+        # Selvsjekk (for tester): kontroller indekser og summer etter hver endring
+        self.self_check = self_check
+        self._listeners = []  # kalles med (hendelse, data) etter hver endring
+
+    def subscribe(self, fn):
+        """Meld fn på endringer. fn(event, data) kalles med en av hendelsene
+        course_added, courses_added, course_deleted, placed, unplaced,
+        semester_cleared, batch_applied (se apply_batch; data har removed og
+        placed som lister med (id, semesterindeks)), prerequisites_set (se
+        set_prerequisites; data har course) og loaded (hele modellen,
+        også planformen, er byttet ut)."""
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def _emit(self, event, **data):
+        for fn in list(self._listeners):
+            fn(event, data)
+
+    def term_for_semester_index(self, idx):
+        return self.shape.terms[idx]
+
+    @property
+    def read_only(self):
+        """True når emnene ligger i en skrivebeskyttet katalog (planen kan fortsatt endres)."""
+        return self._catalog is not None
+
+    def _check_writable(self):
+        if self._catalog is not None:
+            raise ValueError("Emnekatalogen er skrivebeskyttet. Lagre planen som JSON for å endre emnene.")
+
+    def _own_courses(self):
+        # Kopi ved skriving: et snapshot kan fortsatt lese den gamle lista
+        if self._courses_shared:
+            self.courses = list(self.courses)
+            self._courses_shared = False
+
+    def _free_changed(self, c, n):
+        # n emner som c er tatt ut av (-1) eller lagt tilbake i (+1) mengden utenfor
+        # planen. Glemmer også svar som bygger på hvor emnene ligger.
+        self._order = None
+        self._feasible.pop(c.semester, None)
+        if self._free is not None:
+            counts = self._free[c.semester]
+            counts[c.stp] = counts.get(c.stp, 0) + n
+
+    def _free_counts(self, term):
+        if self._free is None:
+            free = {t: {} for t in TERMS}
+            placement = self._placement
+            for c in self.courses:
+                if c.id not in placement:
+                    counts = free[c.semester]
+                    counts[c.stp] = counts.get(c.stp, 0) + 1
+            self._free = free
+        return self._free[term]
+
+    @_reads
+    def snapshot(self):
+        """Konsistent kopi av planen som trygt kan brukes fra en annen tråd."""
+        self._courses_shared = True
+        return PlanSnapshot(self._next_id, self.courses, [list(s) for s in self.plan],
+                            self.shape, list(self._totals))
+
+    @_writes
+    def add_course(self, kode: str, semester: str, stp: int, krav=()):
+        """Nytt emne. krav er id-ene til emner som må ligge i et tidligere semester."""
+        self._check_writable()
+        kode = kode.strip()
+        semester = semester.strip()
+        if not kode:
+            raise ValueError("Emnekode kan ikke være tom.")
+        if kode.lower() in self._by_code:
+            raise ValueError(f"Emnekode '{kode}' finnes allerede.")
+        if semester not in ("høst", "vår"):
+            raise ValueError("Semester må være 'høst' eller 'vår'.")
+        if not isinstance(stp, int) or stp <= 0 or stp > MAX_STP:
+            raise ValueError("Studiepoeng må være heltall mellom 1 og 30.")
+        krav = self._check_krav(None, krav)
+        c = Course(self._next_id, kode, semester, int(stp), krav)
+        self._next_id += 1
+        self._own_courses()
+        self.courses.append(c)
+        self._by_id[c.id] = c
+        self._by_code[c.kode.lower()] = c
+        if self._sorted_codes is not None:
+            insort(self._sorted_codes, c.kode.lower())
+        self._add_edges(c)
+        self._free_changed(c, 1)
+        if self.self_check:
+            self.check_consistency()
+        self._emit("course_added", course=c)
+        return c
+
+    @_writes
+    def add_courses(self, rows):
+        """Legg inn mange emner i én runde. rows gir (linjenr, kode, semester, stp).
+
+        Returnerer (antall lagt til, [(linjenr, feilmelding), ...]).
+        """
+        # Samme regler som add_course, men uten unntak og metodekall per rad
+        self._check_writable()
+        self._own_courses()
+        rejected = []
+        courses, by_id, by_code = self.courses, self._by_id, self._by_code
+        first = len(courses)
+        start = self._next_id
+        next_id = start
+        try:
+            for line_no, kode, semester, stp in rows:
+                kode = kode.strip()
+                semester = semester.strip()
+                key = kode.lower()
+                if not kode:
+                    rejected.append((line_no, "Emnekode kan ikke være tom."))
+                elif key in by_code:
+                    rejected.append((line_no, f"Emnekode '{kode}' finnes allerede."))
+                elif semester != "høst" and semester != "vår":
+                    rejected.append((line_no, "Semester må være 'høst' eller 'vår'."))
+                elif not isinstance(stp, int) or not 1 <= stp <= MAX_STP:
+                    rejected.append((line_no, "Studiepoeng må være heltall mellom 1 og 30."))
+                else:
+                    c = Course(next_id, kode, semester, stp)
+                    courses.append(c)
+                    by_id[next_id] = c
+                    by_code[key] = c
+                    next_id += 1
+        finally:
+            # Også når rows feiler midt i fila (f.eks. UnicodeDecodeError): emnene
+            # som allerede er lagt inn, blir med, og id-ene deres er brukt opp
+            self._next_id = next_id
+            if next_id > start:
+                self._sorted_codes = None  # bygges på nytt ved neste søk
+                self._free = None
+                self._feasible.clear()
+                if self.self_check:
+                    self.check_consistency()
+                self._emit("courses_added", courses=courses[first:])
+        return next_id - start, rejected
+
+    @_writes
+    def delete_course(self, cid: int):
+        """Frivillig 9: Slett et emne. Fjerner også fra studieplanen hvis tilstede."""
+        self._check_writable()
+        course = self.get_course(cid)
+        if not course:
+            raise ValueError("Fant ikke emnet.")
+        # Fjern fra semesteret det ligger i
+        sem_idx = self._placement.get(cid)
+        if sem_idx is not None:
+            self.remove_course_from_semester(cid, sem_idx)
+        # Emner som har dette som krav, mister kravet
+        for dep in sorted(self._dependents_of(cid)):
+            d = self._by_id[dep]
+            d = self._replace_course(d, tuple(k for k in d.krav if k != cid))
+            self._emit("prerequisites_set", course=d)
+        self._closure.pop(cid, None)
+        # Fjern fra emnelista og indeksene
+        self._own_courses()
+        self.courses.remove(course)
+        del self._by_id[cid]
+        del self._by_code[course.kode.lower()]
+        if self._sorted_codes is not None:
+            codes = self._sorted_codes
+            del codes[bisect_left(codes, course.kode.lower())]
+        self._remove_edges(course)
+        self._free_changed(course, -1)
+        if self.self_check:
+            self.check_consistency()
+        self._emit("course_deleted", course=course)
+
+    @_writes
+    def set_prerequisites(self, cid, krav):
+        """Sett kravene til emnet cid (id-er). Sirkulære krav avvises."""
+        self._check_writable()
+        c = self.get_course(cid)
+        if not c:
+            raise ValueError("Fant ikke emnet.")
+        c = self._replace_course(c, self._check_krav(cid, krav))
+        if self.self_check:
+            self.check_consistency()
+        self._emit("prerequisites_set", course=c)
+        return c
+
+    def ids_for_codes(self, codes):
+        """Id-ene til emnekodene i codes (liste, eller tekst skilt med komma/mellomrom)."""
+        if isinstance(codes, str):
+            codes = codes.replace(",", " ").split()
+        ids = []
+        for kode in codes:
+            c = self.find_course_by_code(kode)
+            if not c:
+                raise ValueError(f"Fant ikke emnet {kode}.")
+            ids.append(c.id)
+        return ids
+
+    def _check_krav(self, cid, krav):
+        # Gyldige krav som tuppel (uten duplikater), eller ValueError
+        krav = tuple(dict.fromkeys(krav))
+        for k in krav:
+            if k not in self._by_id:
+                raise ValueError(f"Ukjent krav: emne {k} finnes ikke.")
+            if k == cid or (cid is not None and cid in self._bits and (self._ancestors(k) >> self._bits[cid]) & 1):
+                raise ValueError(f"{self._by_id[k].kode} kan ikke være krav for {self._by_id[cid].kode}: kravene blir sirkulære.")
+        return krav
+
+    def _replace_course(self, c, krav):
+        # Emner deles med snapshots og endres aldri; lag et nytt med de nye kravene
+        new = Course(c.id, c.kode, c.semester, c.stp, krav)
+        self._own_courses()
+        courses = self.courses
+        courses[courses.index(c)] = new
+        self._by_id[c.id] = new
+        self._by_code[c.kode.lower()] = new
+        self._remove_edges(c)
+        self._add_edges(new)
+        self._invalidate_closure(c.id)
+        self._order = None
+        return new
+
+    def _bit(self, cid):
+        b = self._bits.get(cid)
+        if b is None:
+            b = self._bits[cid] = len(self._bit_ids)
+            self._bit_ids.append(cid)
+        return b
+
+    def _add_edges(self, c):
+        for k in c.krav:
+            self._bit(k)
+            if self._dependents is not None:
+                self._dependents.setdefault(k, set()).add(c.id)
+
+    def _remove_edges(self, c):
+        if self._dependents is not None:
+            for k in c.krav:
+                deps = self._dependents.get(k)
+                if deps:
+                    deps.discard(c.id)
+
+    def _dependents_of(self, cid):
+        if self._dependents is None:
+            deps = {}
+            for c in self.courses:
+                for k in c.krav:
+                    deps.setdefault(k, set()).add(c.id)
+            self._dependents = deps
+        return self._dependents.get(cid, ())
+
+    def _invalidate_closure(self, cid):
+        # Kravene til cid er endret: glem bitsettet til cid og alt som bygger på det
+        if not self._closure:
+            return
+        stack = [cid]
+        while stack:
+            x = stack.pop()
+            if self._closure.pop(x, None) is not None:
+                stack.extend(self._dependents_of(x))
+
+    def _ancestors(self, cid):
+        """Bitsett med alle krav til cid, også indirekte (krav til krav ...)."""
+        closure = self._closure
+        bits = closure.get(cid)
+        if bits is not None:
+            return bits
+        # Uten rekursjon, så lange kravkjeder ikke når rekursjonsgrensen. En
+        # sirkel i en innlest fil gir bare at emnet blir sitt eget krav.
+        by_id = self._by_id
+        stack = [cid]
+        on_stack = {cid}
+        while stack:
+            x = stack[-1]
+            # Ett krav om gangen, så stacken alltid er én sti i grafen
+            nxt = next((k for k in by_id[x].krav if k not in closure and k not in on_stack and k in by_id), None)
+            if nxt is not None:
+                stack.append(nxt)
+                on_stack.add(nxt)
+                continue
+            stack.pop()
+            on_stack.discard(x)
+            bits = 0
+            for k in by_id[x].krav:
+                bits |= 1 << self._bit(k)
+                bits |= closure.get(k, 0)
+            closure[x] = bits
+        return closure[cid]
+
+    def get_course(self, cid):
+        return self._by_id.get(cid)
+
+    def find_course_by_code(self, kode):
+        return self._by_code.get(kode.strip().lower())
+
+    @_reads
+    def search_courses(self, prefix):
+        """Emner der koden starter med prefix (uten hensyn til store/små bokstaver), sortert på kode."""
+        if self._catalog is not None:
+            return self._catalog.search(prefix)  # katalogen har sin egen sorterte kodeindeks
+        if self._sorted_codes is None:
+            self._sorted_codes = sorted(self._by_code)
+        key = prefix.strip().lower()
+        codes = self._sorted_codes
+        lo = bisect_left(codes, key)
+        hi = bisect_left(codes, key + "\U0010ffff", lo)  # alle koder som starter med key
+        by_code = self._by_code
+        return [by_code[k] for k in codes[lo:hi]]
+
+    def course_in_plan(self, cid):
+        return cid in self._placement
+
+    def total_credits(self, sem_idx):
+        return self._totals[sem_idx]
+
+    @_writes
+    def add_course_to_semester(self, cid, sem_idx):
+        c = self.get_course(cid)
+        if not c:
+            raise ValueError("Ugyldig emne.")
+        if self.course_in_plan(cid):
+            raise ValueError("Emnet er allerede i studieplanen.")
+        riktig_term = self.term_for_semester_index(sem_idx)
+        if c.semester != riktig_term:
+            allowed = self.shape.allowed(c.semester) or "(ingen)"
+            raise ValueError(f"{c.kode} er et {c.semester}-emne og kan bare ligge i semester {allowed}.")
+        target = self.shape.target
+        if self.total_credits(sem_idx) + c.stp > target:
+            raise ValueError(f"Ikke plass i semester {sem_idx+1} (maks {target} stp).")
+        self.plan[sem_idx].append(cid)
+        self._placement[cid] = sem_idx
+        self._totals[sem_idx] += c.stp
+        self._free_changed(c, -1)
+        if self.self_check:
+            self.check_consistency()
+        self._emit("placed", cid=cid, sem_idx=sem_idx)
+
+    @_writes
+    def remove_course_from_semester(self, cid, sem_idx):
+        if self._placement.get(cid) == sem_idx:
+            c = self._by_id[cid]
+            self.plan[sem_idx].remove(cid)
+            del self._placement[cid]
+            self._totals[sem_idx] -= c.stp
+            self._free_changed(c, 1)
+            if self.self_check:
+                self.check_consistency()
+            self._emit("unplaced", cid=cid, sem_idx=sem_idx)
+
+    def batch(self):
+        """Ny PlanBatch for modellen. Brukes som
+
+            with model.batch() as b:
+                b.move(3, 0)
+                b.remove(7)
+        """
+        return PlanBatch(self)
+
+    @_writes
+    def apply_batch(self, removals, placements):
+        """Ta ut og legg inn mange emner i én endring.
+
+        removals er (id, semesterindeks) – indeksen kan være None, og emner som
+        ikke ligger der, hoppes over som i remove_course_from_semester.
+        placements er (id, semesterindeks). Uttakene gjøres først, så et emne kan
+        flyttes ved å stå i begge. Årstid, duplikater og stp-målet sjekkes mot
+        planen slik den blir til slutt; bryter noe reglene, kastes ValueError
+        med alle bruddene og planen er urørt. Gir (removed, placed).
+        """
+        n = self.shape.semesters
+        placement = dict(self._placement)
+        totals = list(self._totals)
+        removed = []
+        for cid, sem_idx in removals:
+            at = placement.get(cid)
+            if at is None or (sem_idx is not None and at != sem_idx):
+                continue
+            del placement[cid]
+            totals[at] -= self._by_id[cid].stp
+            removed.append((cid, at))
+        errors = []
+        placed = []
+        for cid, sem_idx in placements:
+            c = self.get_course(cid)
+            if not c:
+                errors.append(f"Ugyldig emne: {cid}.")
+            elif not (isinstance(sem_idx, int) and 0 <= sem_idx < n):
+                errors.append(f"{c.kode}: semester {sem_idx} finnes ikke.")
+            elif cid in placement:
+                errors.append(f"{c.kode} er allerede i studieplanen.")
+            elif c.semester != self.shape.terms[sem_idx]:
+                allowed = self.shape.allowed(c.semester) or "(ingen)"
+                errors.append(f"{c.kode} er et {c.semester}-emne og kan bare ligge i semester {allowed}.")
+            else:
+                placement[cid] = sem_idx
+                totals[sem_idx] += c.stp
+                placed.append((cid, sem_idx))
+        target = self.shape.target
+        touched = {i for _, i in placed}
+        errors.extend(f"Ikke plass i semester {i+1} (maks {target} stp, ville fått {totals[i]})."
+                      for i in sorted(touched) if totals[i] > target)
+        if errors:
+            raise ValueError("\n".join(errors))
+        if not removed and not placed:
+            return removed, placed
+        # Alt er sjekket: ta i bruk endringene
+        gone = {cid for cid, _ in removed}
+        for i in {i for _, i in removed}:
+            self.plan[i] = [cid for cid in self.plan[i] if cid not in gone]
+        for cid, sem_idx in placed:
+            self.plan[sem_idx].append(cid)
+        self._placement = placement
+        self._totals = totals
+        for cid, _ in removed:
+            self._free_changed(self._by_id[cid], 1)
+        for cid, _ in placed:
+            self._free_changed(self._by_id[cid], -1)
+        if self.self_check:
+            self.check_consistency()
+        self._emit("batch_applied", removed=removed, placed=placed)
+        return removed, placed
+
+    @_writes
+    def clear_semester(self, sem_idx):
+        cids = list(self.plan[sem_idx])
+        for cid in cids:
+            self._placement.pop(cid, None)
+            self._free_changed(self._by_id[cid], 1)
+        self.plan[sem_idx].clear()
+        self._totals[sem_idx] = 0
+        if self.self_check:
+            self.check_consistency()
+        self._emit("semester_cleared", sem_idx=sem_idx, cids=cids)
+
+    @_reads
+    def placement_options(self, cid):
+        """Semestrene emnet cid kan legges i nå, som {semesterindeks: ok}.
+
+        ok er True hvis alle semestrene fortsatt kan fylles til stp-målet med
+        emnene som er igjen etter plasseringen. Svarene huskes til neste endring
+        som gjelder samme årstid, så det er billig å spørre for hvert klikk.
+        Emner som alt ligger i planen, gir {}.
+        """
+        c = self.get_course(cid)
+        if c is None or cid in self._placement:
+            return {}
+        target = self.shape.target
+        # De andre årstidene påvirkes ikke av plasseringen, men må også kunne fylles
+        others_ok = all(self._can_fill(t) for t in TERMS if t != c.semester)
+        options = {}
+        for i, term in enumerate(self.shape.terms):
+            if term == c.semester and self._totals[i] + c.stp <= target:
+                options[i] = others_ok and self._can_fill(term, c.stp, i)
+        return options
+
+    def _can_fill(self, term, stp=None, sem_idx=None):
+        # Kan semestrene i term fylles til stp-målet (etter å ha lagt et emne
+        # med stp i sem_idx)? Huskes i _feasible til årstiden endres.
+        cache = self._feasible.setdefault(term, {})
+        key = (stp, sem_idx)
+        ok = cache.get(key)
+        if ok is None:
+            from studieplan_solver import can_fill  # importeres først når den trengs
+            target = self.shape.target
+            counts = self._free_counts(term)
+            if stp is not None:
+                counts = dict(counts)
+                counts[stp] -= 1
+            rems = [target - tot - (stp if i == sem_idx else 0)
+                    for i, tot in enumerate(self._totals) if self.shape.terms[i] == term]
+            ok = cache[key] = can_fill(counts, rems)
+        return ok
+
+    @_reads
+    def validate_plan(self):
+        target = self.shape.target
+        return [(i, tot) for i, tot in enumerate(self._totals) if tot != target]
+
+    @_reads
+    def credit_totals(self):
+        """Sum stp per semester (kopi)."""
+        return list(self._totals)
+
+    @_reads
+    def validate_order(self):
+        """Emner i planen med krav som ikke ligger i et tidligere semester.
+
+        Gir [(id, [krav-id-er som mangler eller ligger for sent]), ...] i
+        planrekkefølge; tom liste når rekkefølgen er i orden. Indirekte krav
+        telles med. Svaret huskes til neste endring i planen eller kravene.
+        """
+        if self._order is not None:
+            return list(self._order)
+        problems = []
+        bits = self._bits
+        by_id = self._by_id
+        ancestors = {cid: self._ancestors(cid) for sem in self.plan for cid in sem if by_id[cid].krav}
+        before = 0  # bitsett med kravemner i semestrene før dette
+        for sem in self.plan:
+            for cid in sem:
+                if cid in ancestors:
+                    missing = ancestors[cid] & ~before
+                    if missing:
+                        problems.append((cid, self._ids_in(missing)))
+            for cid in sem:
+                b = bits.get(cid)
+                if b is not None:
+                    before |= 1 << b
+        self._order = problems
+        return list(problems)
+
+    def _ids_in(self, bits):
+        ids = []
+        while bits:
+            low = bits & -bits
+            ids.append(self._bit_ids[low.bit_length() - 1])
+            bits ^= low
+        return sorted(ids)
+
+    @_writes
+    def set_shape(self, shape):
+        """Bytt planform. Emner som ikke lenger passer (semesteret finnes ikke, feil
+        årstid eller over stp-målet) tas ut av planen, men beholdes som emner."""
+        old_plan = self.plan
+        self.shape = shape
+        self.plan = [[] for _ in range(shape.semesters)]
+        for i, sem in enumerate(old_plan[:shape.semesters]):
+            term = shape.terms[i]
+            total = 0
+            for cid in sem:
+                c = self._by_id[cid]
+                if c.semester == term and total + c.stp <= shape.target:
+                    self.plan[i].append(cid)
+                    total += c.stp
+        self._reindex()
+        self._emit("loaded")
+
+    @_writes
+    def auto_plan(self):
+        """Fyll alle semestre til stp-målet med emner som ikke allerede er i planen."""
+        from studieplan_solver import solve_plan  # importeres først når den trengs
+        placements = solve_plan(self)
+        if placements is None:
+            raise ValueError("Fant ingen gyldig studieplan med de registrerte emnene.")
+        self.apply_batch([], placements)  # én endring og én hendelse for hele planen
+        return placements
+
+    @_reads
+    def count_plans(self):
+        """Antall gyldige planer: måter å fylle alle semestre til stp-målet med
+        emner utenfor planen. Emner i planen blir liggende; krav telles ikke med.
+        Regnes eksakt uten å lage planene (se studieplan_solver.count_plan)."""
+        from studieplan_solver import count_plan
+        return count_plan(self)
+
+    @_reads
+    def iter_plans(self, limit=None):
+        """Generator med de gyldige planene (se count_plans), høyst limit stykker.
+        Hver plan er en liste med (id, semesterindeks), som fra auto_plan. Bygger på
+        planen slik den er nå; senere endringer påvirker ikke generatoren."""
+        from studieplan_solver import iter_plan
+        return iter_plan(self, limit)
+
+    @_reads
+    def placement_flags(self):
+        """{id: "alltid" | "noen ganger" | "aldri"}: om emnet er med i alle, noen
+        eller ingen av de gyldige planene (se count_plans)."""
+        from studieplan_solver import placement_flags
+        return placement_flags(self)
+
+    @property
+    def next_id(self):
+        return self._next_id
+
+    def to_json(self):
+        # Serialiseres fra et snapshot, så låsen bare holdes mens det lages
+        return self.snapshot().to_json()
+
+    def parse_course(self, raw):
+        """Tolk og valider ett emne fra fil. Gir None hvis emnet må kastes."""
+        try:
+            cid = int(raw["id"])
+            kode = str(raw["kode"]).strip()
+            sem = raw["semester"]
+            stp = int(raw["stp"])
+        except Exception:
+            return None
+        if not kode or sem not in TERMS or stp < 1 or stp > MAX_STP:
+            return None
+        try:
+            krav = tuple(int(k) for k in raw.get("krav", ()))
+        except Exception:
+            krav = ()  # ugyldige krav kastes, emnet beholdes
+        return Course(cid, kode, sem, stp, krav)
+
+    @_writes
+    def load_parsed(self, next_id, courses, raw_plan, shape=DEFAULT_SHAPE, shared=False):
+        """Ta i bruk ferdig tolkede emner (se parse_course), en rå plan og planformen fra fila.
+
+        shared=True: bruk den felles katalogen for de samme emnene (se
+        shared_catalog) i stedet for en egen kopi. Emnene blir da skrivebeskyttet.
+        """
+        if shared:
+            self.attach_catalog(shared_catalog(next_id, courses), raw_plan, shape)
+            return
+        self._release_catalog()
+        # next_id
+        try:
+            self._next_id = int(next_id)
+        except Exception:
+            self._next_id = 1
+        # courses (duplikate koder og id-er kastes)
+        self.courses = _clean_courses(courses)
+        self._courses_shared = False
+        # plan
+        self.shape = shape
+        new_plan = [[] for _ in range(shape.semesters)]
+        if raw_plan is None:
+            raw_plan = []
+        valid_ids = {c.id for c in self.courses}
+        for i in range(shape.semesters):
+            try:
+                ids = [int(x) for x in raw_plan[i]] if i < len(raw_plan) else []
+            except Exception:
+                ids = []
+            # filtrer til gyldige id-er
+            new_plan[i] = [cid for cid in ids if cid in valid_ids]
+        self.plan = new_plan
+        self._reindex()
+        self._emit("loaded")
+
+    @_writes
+    def attach_catalog(self, catalog, raw_plan, shape=DEFAULT_SHAPE):
+        """Bruk emnene i catalog (studieplan_catalog.MappedCatalog eller SharedCatalog)
+        uten å lese dem inn.
+
+        Emnene blir skrivebeskyttet; planen holdes i minnet og kan endres som vanlig.
+        """
+        self._release_catalog()
+        self._catalog = catalog
+        self.courses = catalog
+        self._courses_shared = False
+        self._next_id = catalog.next_id
+        self._by_id = catalog.by_id
+        self._by_code = catalog.by_code
+        self.shape = shape
+        self.plan = [[] for _ in range(shape.semesters)]
+        for i, ids in enumerate((raw_plan or [])[:shape.semesters]):
+            try:
+                self.plan[i] = [cid for cid in map(int, ids) if cid in catalog.by_id]
+            except Exception:
+                pass
+        self._reindex()
+        self._emit("loaded")
+
+    def _release_catalog(self):
+        # Ikke close(): et snapshot kan fortsatt lese fra katalogen. Mappingen
+        # lukkes når ingen lenger bruker den.
+        self._catalog = None
+
+    def load_json(self, data, shared=False):
+        """Les en plan fra data (som fra to_json). shared: se load_parsed."""
+        parsed = (self.parse_course(c) for c in data.get("courses", []))
+        self.load_parsed(data.get("next_id", 1), [c for c in parsed if c is not None], data.get("plan"),
+                         PlanShape.from_dict(data.get("shape")), shared)
+
+    def _reindex(self):
+        # Bygg indeksene på nytt etter innlasting. Et emne som står i flere
+        # semestre beholdes bare i det første.
+        if self._catalog is None:
+            self._by_id = {c.id: c for c in self.courses}
+            self._by_code = {c.kode.lower(): c for c in self.courses}
+        self._sorted_codes = None
+        self._free = None
+        self._feasible = {}
+        self._dependents = None
+        if self._catalog is not None:
+            # Kravene i en katalog kan ikke endres, så katalogen deler ut
+            # bitnumrene (SharedCatalog deler også tillukningen mellom planene)
+            catalog = self._catalog
+            self._bits, self._bit_ids, self._closure = catalog.bits, catalog.bit_ids, catalog.closure
+        else:
+            self._bits = {}
+            self._bit_ids = []
+            self._closure = {}
+            # Alle krav får bitnummer nå: sirkelsjekken i _check_krav trenger
+            # dem, og validate_order (leselås) skal aldri endre _bits
+            for c in self.courses:
+                self._add_edges(c)
+        self._order = None
+        self._placement = {}
+        self._totals = [0] * len(self.plan)
+        for i, sem in enumerate(self.plan):
+            kept = []
+            for cid in sem:
+                if cid not in self._placement:
+                    self._placement[cid] = i
+                    self._totals[i] += self._by_id[cid].stp
+                    kept.append(cid)
+            self.plan[i] = kept
+        if self.self_check:
+            self.check_consistency()
+
+    def check_consistency(self):
+        """Regn ut indekser og semestersummer fra bunnen og sammenlign med de lagrede."""
+        if self._catalog is None:  # katalogens indekser ligger i fila og endres aldri
+            assert self._by_id == {c.id: c for c in self.courses}, "id-indeksen er ute av takt"
+            assert self._by_code == {c.kode.lower(): c for c in self.courses}, "kode-indeksen er ute av takt"
+        if self._sorted_codes is not None:
+            assert self._sorted_codes == sorted(self._by_code), "prefiksindeksen er ute av takt"
+        placement = {cid: i for i, sem in enumerate(self.plan) for cid in sem}
+        assert self._placement == placement, "plasseringsindeksen er ute av takt"
+        if self._free is not None:
+            free = {t: {} for t in TERMS}
+            for c in self.courses:
+                if c.id not in placement:
+                    free[c.semester][c.stp] = free[c.semester].get(c.stp, 0) + 1
+            actual = {t: {v: n for v, n in counts.items() if n} for t, counts in self._free.items()}
+            assert actual == free, "antall emner utenfor planen er ute av takt"
+        if self._dependents is not None:
+            deps = {}
+            for c in self.courses:
+                for k in c.krav:
+                    deps.setdefault(k, set()).add(c.id)
+            actual = {k: v for k, v in self._dependents.items() if v}
+            assert actual == deps, "kravindeksen er ute av takt"
+        for c in self.courses:
+            for k in c.krav:
+                assert k in self._bits, f"krav {k} til emne {c.id} har ikke bitnummer"
+        for cid, bits in self._closure.items():
+            saved, self._closure = self._closure, {}
+            try:
+                fresh = self._ancestors(cid)
+            finally:
+                self._closure = saved
+            assert bits == fresh, f"kravene til emne {cid} er ute av takt"
+        for i, sem in enumerate(self.plan):
+            tot = sum(self._by_id[cid].stp for cid in sem)
+            assert self._totals[i] == tot, f"semester {i+1}: lagret sum {self._totals[i]}, faktisk {tot}"
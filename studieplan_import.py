@@ -0,0 +1,87 @@
+# -----------------------------------------------------
+# Studieplan – masseimport av emner
+# Leser CSV (kolonnene kode, semester, stp) eller JSON Lines (ett objekt per
+# linje med de samme feltene) rad for rad, så hele fila aldri ligger i minnet.
+# Avviste rader rapporteres med linjenummer.
+# -----------------------------------------------------
+import csv
+import json
+import os
+
+from studieplan_io import paused_gc
+
+
+FIELDS = ("kode", "semester", "stp")
+
+
+def _csv_records(f):
+    # Gir (linjenr, kode, semester, stp) med rå strenger, eller (linjenr, None)
+    reader = csv.reader(f)
+    header = [h.strip().lower() for h in next(reader, [])]
+    if not all(k in header for k in FIELDS):
+        raise ValueError("CSV-fila må ha kolonnene kode, semester og stp.")
+    ik, isem, istp = (header.index(k) for k in FIELDS)
+    for row in reader:
+        try:
+            yield reader.line_num, row[ik], row[isem], row[istp]
+        except IndexError:
+            yield reader.line_num, None, None, None
+
+
+def _jsonl_records(f):
+    loads = json.loads
+    for line_no, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            rec = loads(line)
+            yield line_no, rec["kode"], rec["semester"], rec["stp"]
+        except (ValueError, KeyError, TypeError):
+            yield line_no, None, None, None
+
+
+def _is_jsonl(path, f):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return True
+    if ext == ".csv":
+        return False
+    # Ukjent endelse: se på første tegn
+    first = f.read(1)
+    f.seek(0)
+    return first == "{"
+
+
+def iter_course_rows(path, rejected):
+    """Gi (linjenr, kode, semester, stp) for hver rad som lar seg tolke.
+
+    Rader med manglende eller feil felt legges i rejected som (linjenr, melding).
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        records = _jsonl_records(f) if _is_jsonl(path, f) else _csv_records(f)
+        for line_no, kode, semester, stp in records:
+            try:
+                kode = str(kode).strip() if kode is not None else ""
+                if isinstance(stp, float) and not stp.is_integer():
+                    raise ValueError(stp)  # 7.9 skal avvises, som "7.9" i CSV
+                stp = int(stp)
+            except (TypeError, ValueError, OverflowError):
+                rejected.append((line_no, "Mangler eller ugyldig felt (kode, semester, stp)."))
+                continue
+            if not kode:
+                rejected.append((line_no, "Emnekode kan ikke være tom."))
+                continue
+            yield line_no, kode, str(semester).strip().lower(), stp
+
+
+def import_courses(model, path):
+    """Importer emner fra en CSV- eller JSONL-fil til model.
+
+    Returnerer (antall lagt til, [(linjenr, melding), ...]) sortert på linjenummer.
+    """
+    rejected = []
+    with paused_gc():
+        added, bad = model.add_courses(iter_course_rows(path, rejected))
+    rejected.extend(bad)
+    rejected.sort()
+    return added, rejected
@@ -0,0 +1,216 @@
+# -----------------------------------------------------
+# Studieplan – lagring og innlasting av planfiler
+# - Kompakt lagring: ingen innrykk, emnene skrives i biter i stedet for at
+#   hele dokumentet bygges i minnet først.
+# - Innlasting: leser fila bit for bit og tolker "courses" ett emne om gangen,
+#   så vi aldri holder hele JSON-treet og emnelista samtidig.
+# - Lagring går via en midlertidig fil som så døpes om (os.replace), så en
+#   krasj midt i en lagring aldri etterlater en halvskrevet planfil.
+# Begge funksjonene returnerer hvor lang tid de brukte (sekunder).
+# -----------------------------------------------------
+import gc
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from studieplan_core import DEFAULT_SHAPE, PlanShape
+from studieplan_profile import timed
+
+CHUNK = 1 << 16   # tegn per lesing
+BATCH = 1000      # emner per skriving
+
+_WS = re.compile(r"[ \t\n\r]*")
+_decode = json.JSONDecoder().raw_decode
+
+
+@contextmanager
+def paused_gc():
+    """Slå av syklisk GC mens vi lager svært mange objekter på én gang."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+@timed("io.save_plan")
+def save_plan(model, path, compact=False, extra=None):
+    """Lagre model (eller et PlanSnapshot, se Model.snapshot) til path atomisk.
+
+    extra er valgfrie ekstra nøkler på toppnivå (f.eks. journal-generasjon).
+    """
+    t0 = time.perf_counter()
+    fd, tmp = tempfile.mkstemp(prefix=".studieplan-", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            if compact:
+                _write_compact(model, f, extra)
+            else:
+                json.dump({**model.to_json(), **(extra or {})}, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)
+        else:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return time.perf_counter() - t0
+
+
+def _write_compact(model, f, extra=None):
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    f.write('{"next_id":%d,"courses":[' % model.next_id)
+    courses = model.courses
+    for start in range(0, len(courses), BATCH):
+        if start:
+            f.write(",")
+        f.write(",".join(encode(c.to_dict()) for c in courses[start:start + BATCH]))
+    f.write('],"plan":')
+    f.write(encode(model.plan))
+    if model.shape != DEFAULT_SHAPE:
+        f.write(',"shape":' + encode(model.shape.to_dict()))
+    for key, value in (extra or {}).items():
+        f.write(f",{encode(key)}:{encode(value)}")
+    f.write("}")
+
+
+class _Reader:
+    """Minimal strømmende JSON-leser: hopper over tegn og dekoder én verdi om gangen."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.f.read(CHUNK)
+        if not data:
+            self.eof = True
+            return False
+        if self.pos > CHUNK:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += data
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Ugyldig JSON: fila slutter for tidlig.")
+
+    def expect(self, ch):
+        if self.peek() != ch:
+            raise ValueError(f"Ugyldig JSON: ventet '{ch}', fant '{self.buf[self.pos]}'.")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                val, end = _decode(self.buf, self.pos)
+                # Et tall helt i slutten av bufferet kan fortsette i neste bit
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def array(self):
+        """Gi elementene i en JSON-liste ett om gangen."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        match = _WS.match
+        while True:
+            if not self.eof and len(self.buf) - self.pos < CHUNK:
+                self._fill()
+            buf = self.buf
+            start = match(buf, self.pos).end()
+            # Hurtigvei: dekod alle hele objekter i bufferet med ett json.loads-
+            # kall. Kuttet legges ved siste "}," – treffer det inne i en streng
+            # eller et nøstet objekt, blir teksten ugyldig og vi faller tilbake.
+            cut = buf.rfind("}", start)
+            nxt = match(buf, cut + 1).end() if cut > start else len(buf)
+            if nxt < len(buf) and buf[nxt] == ",":
+                try:
+                    batch = json.loads("[" + buf[start:cut + 1] + "]")
+                except ValueError:
+                    batch = None
+                if batch is not None:
+                    self.pos = nxt + 1
+                    yield from batch
+                    continue
+            # Ett element om gangen (også det siste før "]")
+            val = self.value()
+            sep = self.peek()
+            self.pos += 1
+            yield val
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"Ugyldig JSON: ventet ',' eller ']', fant '{sep}'.")
+
+    def items(self, close):
+        # Går gjennom elementene i en liste/et objekt til og med close-tegnet
+        if self.peek() == close:
+            self.pos += 1
+            return
+        while True:
+            yield
+            sep = self.peek()
+            self.pos += 1
+            if sep == close:
+                return
+            if sep != ",":
+                raise ValueError(f"Ugyldig JSON: ventet ',' eller '{close}', fant '{sep}'.")
+
+
+@timed("io.load_plan")
+def load_plan(model, path, extra=None, shared=False):
+    """Les planfila inn i model. Ukjente nøkler på toppnivå legges i extra (dict)
+    hvis den er gitt, ellers hoppes de over. shared: se Model.load_parsed."""
+    t0 = time.perf_counter()
+    next_id, courses, plan, shape = 1, [], None, None
+    with open(path, "r", encoding="utf-8") as f, paused_gc():
+        r = _Reader(f)
+        r.expect("{")
+        for _ in r.items("}"):
+            key = r.value()
+            r.expect(":")
+            if key == "courses":
+                parse = model.parse_course
+                for raw in r.array():
+                    c = parse(raw)
+                    if c is not None:
+                        courses.append(c)
+            elif key == "next_id":
+                next_id = r.value()
+            elif key == "plan":
+                plan = r.value()
+            elif key == "shape":
+                shape = r.value()
+            elif extra is not None:
+                extra[key] = r.value()
+            else:
+                r.value()
+        model.load_parsed(next_id, courses, plan, PlanShape.from_dict(shape), shared)
+    return time.perf_counter() - t0
@@ -0,0 +1,192 @@
+# -----------------------------------------------------
+# Studieplan – journal-lagring
+# En journalført plan består av to filer:
+#   plan.json      vanlig planfil (øyeblikksbilde) med "journal_gen"
+#   plan.json.log  JSON Lines: én header-linje og så én linje per endring
+# Hver endring i modellen legges til som en liten linje i loggen, så lagring
+# koster like mye som endringen – ikke like mye som hele planen. Etter
+# COMPACT_EVERY endringer skrives et nytt øyeblikksbilde og loggen tømmes.
+#
+# Generasjonsnummeret i header og øyeblikksbilde må være likt for at loggen
+# spilles av. Krasjer vi mellom nytt bilde og ny logg, har bildet allerede
+# fått neste generasjon, og den gamle loggen blir ignorert i stedet for å
+# spilles av to ganger.
+# -----------------------------------------------------
+import json
+import os
+import time
+
+from studieplan_io import load_plan, save_plan
+from studieplan_profile import timed
+
+LOG_SUFFIX = ".log"
+COMPACT_EVERY = 1000
+
+
+def journal_path(path):
+    return path + LOG_SUFFIX
+
+
+def has_journal(path):
+    return os.path.exists(journal_path(path))
+
+
+def _records(event, data):
+    # Gjør en modellhendelse om til journalposter
+    if event == "course_added":
+        c = data["course"]
+        return [{"op": "add", **c.to_dict()}]
+    if event == "courses_added":
+        return [{"op": "add", **c.to_dict()} for c in data["courses"]]
+    if event == "course_deleted":
+        return [{"op": "del", "id": data["course"].id}]
+    if event == "placed":
+        return [{"op": "place", "id": data["cid"], "sem": data["sem_idx"]}]
+    if event == "unplaced":
+        return [{"op": "unplace", "id": data["cid"], "sem": data["sem_idx"]}]
+    if event == "semester_cleared":
+        return [{"op": "clear", "sem": data["sem_idx"]}]
+    if event == "prerequisites_set":
+        c = data["course"]
+        return [{"op": "krav", "id": c.id, "krav": list(c.krav)}]
+    if event == "batch_applied":
+        # Én linje, så en halvskrevet bunke aldri spilles av halvveis
+        return [{"op": "batch", "remove": data["removed"], "place": data["placed"]}]
+    return None
+
+
+def _apply(model, rec):
+    op = rec["op"]
+    if op == "add":
+        c = model.add_course(rec["kode"], rec["semester"], rec["stp"], rec.get("krav", ()))
+        if c.id != rec["id"]:
+            raise ValueError("Journalen passer ikke med planfila (emne-id-ene stemmer ikke).")
+    elif op == "del":
+        model.delete_course(rec["id"])
+    elif op == "place":
+        model.add_course_to_semester(rec["id"], rec["sem"])
+    elif op == "unplace":
+        model.remove_course_from_semester(rec["id"], rec["sem"])
+    elif op == "clear":
+        model.clear_semester(rec["sem"])
+    elif op == "krav":
+        model.set_prerequisites(rec["id"], rec["krav"])
+    elif op == "batch":
+        model.apply_batch([tuple(r) for r in rec["remove"]], [tuple(p) for p in rec["place"]])
+    else:
+        raise ValueError(f"Ukjent journalpost: {op!r}")
+
+
+def _replay(model, path, gen):
+    """Spill av loggen for generasjon gen.
+
+    Returnerer antall poster, eller None hvis det ikke finnes noen logg som hører
+    til dette øyeblikksbildet.
+    """
+    try:
+        f = open(journal_path(path), "r", encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    with f:
+        lines = f.read().splitlines()
+    try:
+        header = json.loads(lines[0]) if lines else {}
+    except ValueError:
+        header = {}
+    if not gen or header.get("gen") != gen:
+        return None  # mangler, eller utdatert logg fra før siste komprimering
+    count = 0
+    for n, line in enumerate(lines[1:], start=2):
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            if n == len(lines):
+                break  # halvskrevet siste linje etter en krasj
+            raise ValueError(f"Ødelagt journal på linje {n}.")
+        _apply(model, rec)
+        count += 1
+    return count
+
+
+class Journal:
+    """Skriver hver endring i modellen til plan.json.log."""
+
+    def __init__(self, model, path, compact=False, compact_every=COMPACT_EVERY):
+        self.model = model
+        self.path = path
+        self.compact_mode = compact  # kompakt JSON i øyeblikksbildet
+        self.compact_every = compact_every
+        self.gen = 0
+        self.count = 0  # poster i loggen siden siste komprimering
+        self._log = None
+
+    @classmethod
+    @timed("journal.open")
+    def open(cls, model, path, compact=False):
+        """Les en journalført plan (bilde + logg) og fortsett journalen.
+
+        Returnerer (journal, sekunder brukt på innlasting).
+        """
+        t0 = time.perf_counter()
+        extra = {}
+        load_plan(model, path, extra=extra)
+        journal = cls(model, path, compact=compact)
+        journal.gen = extra.get("journal_gen", 0)
+        count = _replay(model, path, journal.gen)
+        secs = time.perf_counter() - t0
+        if count is None:
+            journal.compact()  # ingen gyldig logg: start en ny journal
+        else:
+            journal.count = count
+            journal._log = open(journal_path(path), "a", encoding="utf-8")
+        model.subscribe(journal._on_event)
+        return journal, secs
+
+    def start(self):
+        """Skriv et første øyeblikksbilde og begynn å journalføre. Returnerer sekunder."""
+        secs = self.compact()
+        self.model.subscribe(self._on_event)
+        return secs
+
+    @timed("journal.compact")
+    def compact(self):
+        """Skriv hele planen som nytt bilde og start en tom logg. Returnerer sekunder."""
+        t0 = time.perf_counter()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.gen += 1
+        save_plan(self.model, self.path, compact=self.compact_mode, extra={"journal_gen": self.gen})
+        tmp = journal_path(self.path) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"journal": 1, "gen": self.gen}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, journal_path(self.path))
+        self._log = open(journal_path(self.path), "a", encoding="utf-8")
+        self.count = 0
+        return time.perf_counter() - t0
+
+    def close(self):
+        self.model.unsubscribe(self._on_event)
+        if self._log is not None:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._log.close()
+            self._log = None
+
+    @timed("journal.write")
+    def _on_event(self, event, data):
+        if event == "loaded":
+            self.compact()  # hele modellen er byttet ut
+            return
+        records = _records(event, data)
+        if not records:
+            return
+        if self.count + len(records) > self.compact_every:
+            # Store endringer (f.eks. import) blir like gjerne et nytt bilde
+            self.compact()
+            return
+        self._log.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        self._log.flush()
+        self.count += len(records)
@@ -0,0 +1,179 @@
+# -----------------------------------------------------
+# Studieplan – lastgenerator for tjenermodus
+# Åpner mange samtidige forbindelser mot studieplan_server.py og sender en
+# blanding av lesing og endringer så fort svarene kommer. Skriver antall
+# forespørsler per sekund og svartider (p50/p95/p99) per metode.
+#
+#   python studieplan_server.py --port 8765 &
+#   python studieplan_loadgen.py --port 8765 --clients 32 --seconds 10
+#
+# Uten --port startes en tjener i samme prosess på en ledig port.
+# -----------------------------------------------------
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+
+from studieplan_server import DEFAULT_HOST, LIMIT, PlanService, serve
+
+# Andel av forespørslene per metode (lesing dominerer, som hos rådgiververktøyene)
+MIX = (
+    ("validate_plan", 50),
+    ("find_course", 25),
+    ("add_course", 10),
+    ("add_course_to_semester", 10),
+    ("remove_course_from_semester", 5),
+)
+
+
+class Client:
+    """Én forbindelse. call() kan brukes fra flere oppgaver samtidig."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.next_id = 0
+        self.pending = {}  # id -> Future
+        self._task = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port, limit=LIMIT)
+        return cls(reader, writer)
+
+    async def _read(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            resp = json.loads(line)
+            fut = self.pending.pop(resp.get("id"), None)
+            if fut is not None and not fut.done():
+                fut.set_result(resp)
+        for fut in self.pending.values():
+            fut.set_exception(ConnectionError("Tjeneren lukket forbindelsen."))
+
+    async def call(self, method, **params):
+        """Send én forespørsel og vent på svaret. Gir hele svarobjektet."""
+        self.next_id += 1
+        rid = self.next_id
+        fut = asyncio.get_running_loop().create_future()
+        self.pending[rid] = fut
+        msg = {"jsonrpc": "2.0", "id": rid, "method": method, "params": params}
+        self.writer.write(json.dumps(msg, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return await fut
+
+    async def close(self):
+        self.writer.close()
+        self._task.cancel()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def _worker(client, n, deadline, rng, latencies, errors, state):
+    methods = [m for m, w in MIX for _ in range(w)]
+    while time.perf_counter() < deadline:
+        method = rng.choice(methods)
+        if method == "add_course":
+            state["codes"] += 1
+            params = {"kode": f"L{n}-{state['codes']}", "semester": rng.choice(("høst", "vår")), "stp": rng.choice((5, 10))}
+        elif method == "find_course":
+            params = {"kode": f"L{n}-{rng.randint(1, max(1, state['codes']))}"}
+        elif method in ("add_course_to_semester", "remove_course_from_semester"):
+            params = {"id": rng.randint(1, max(1, state["codes"])), "semester": rng.randint(1, 6)}
+        else:
+            params = {}
+        t0 = time.perf_counter()
+        resp = await client.call(method, **params)
+        latencies.setdefault(method, []).append(time.perf_counter() - t0)
+        # Regelbrudd (fullt semester, feil årstid ...) er forventet; andre feil telles
+        err = resp.get("error")
+        if err and err.get("code") != 1:
+            errors[method] = errors.get(method, 0) + 1
+
+
+async def run(host, port, clients=16, seconds=5.0, pipeline=1, seed=1):
+    """Kjør lasten og gi {"requests", "seconds", "rps", "methods": {...}, "errors": {...}}."""
+    conns = [await Client.connect(host, port) for _ in range(clients)]
+    latencies, errors = {}, {}
+    state = {"codes": 0}
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    deadline = t0 + seconds
+    # pipeline > 1: flere forespørsler ute samtidig på hver forbindelse
+    await asyncio.gather(*(
+        _worker(c, i, deadline, random.Random(rng.random()), latencies, errors, state)
+        for i, c in enumerate(conns) for _ in range(pipeline)
+    ))
+    elapsed = time.perf_counter() - t0
+    for c in conns:
+        await c.close()
+    total = sum(len(v) for v in latencies.values())
+    methods = {}
+    for m, vals in sorted(latencies.items()):
+        vals.sort()
+        methods[m] = {"requests": len(vals), "p50_s": _percentile(vals, 0.5),
+                      "p95_s": _percentile(vals, 0.95), "p99_s": _percentile(vals, 0.99)}
+    return {"requests": total, "seconds": elapsed, "rps": total / elapsed, "methods": methods, "errors": errors}
+
+
+def _start_local_server():
+    # Tjener i en egen tråd med egen hendelsesløkke, så lastgeneratoren og
+    # tjeneren ikke deler løkke (det ville gitt for gode svartider)
+    ready = threading.Event()
+    port = []
+
+    def target():
+        def on_ready(p):
+            port.append(p)
+            ready.set()
+        asyncio.run(serve(PlanService(), DEFAULT_HOST, 0, on_ready))
+
+    threading.Thread(target=target, daemon=True).start()
+    ready.wait()
+    return port[0]
+
+
+def report(res):
+    print(f"\n{res['requests']} forespørsler på {res['seconds']:.2f} s: {res['rps']:.0f} per sekund")
+    print(f"{'metode':<30}{'antall':>9}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for m, s in res["methods"].items():
+        print(f"{m:<30}{s['requests']:>9}{s['p50_s'] * 1e3:>9.2f}ms{s['p95_s'] * 1e3:>9.2f}ms{s['p99_s'] * 1e3:>9.2f}ms")
+    for m, n in res["errors"].items():
+        print(f"⚠️  {n} uventede feil fra {m}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mål forespørsler per sekund og svartid mot studieplan_server.py.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, help="tjenerens port (default: start en tjener lokalt)")
+    parser.add_argument("--clients", type=int, default=16, help="samtidige forbindelser (default: 16)")
+    parser.add_argument("--pipeline", type=int, default=1, help="forespørsler ute samtidig per forbindelse (default: 1)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="hvor lenge lasten kjøres (default: 5)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="skriv resultatene som JSON hit")
+    args = parser.parse_args(argv)
+
+    port = args.port if args.port is not None else _start_local_server()
+    try:
+        res = asyncio.run(run(args.host, port, args.clients, args.seconds, args.pipeline, args.seed))
+    except OSError as e:
+        print("❌", e, file=sys.stderr)
+        return 1
+    report(res)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
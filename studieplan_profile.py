@@ -0,0 +1,171 @@
+# -----------------------------------------------------
+# Studieplan – tidsmåling (profilering)
+# Slås på med miljøvariabelen STUDIEPLAN_PROFILE (1 = på, ellers et filnavn
+# som målingene skrives til som JSON ved avslutning), --profile i terminalen
+# eller Fil → Profilering i GUI.
+#
+# For hvert målepunkt telles antall kall, samlet tid, snitt, p95 og maks.
+# - Filoperasjoner og GUI-oppdateringer er merket med @timed. Når målingen er
+#   av, koster det bare en sjekk av et flagg per kall.
+# - Model-metodene er så raske at selv den sjekken syns, så de pakkes inn
+#   først når målingen slås på (enable()).
+# -----------------------------------------------------
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+ENV_VAR = "STUDIEPLAN_PROFILE"
+SAMPLES = 2048  # siste målinger per punkt som p95 regnes ut fra
+
+# Model-metodene som måles når profilering slås på
+MODEL_METHODS = (
+    "add_course", "add_courses", "delete_course", "find_course_by_code", "search_courses",
+    "total_credits", "placement_options", "add_course_to_semester", "remove_course_from_semester",
+    "apply_batch", "clear_semester", "validate_plan", "auto_plan", "count_plans", "placement_flags",
+    "set_shape", "to_json", "load_json", "load_parsed", "attach_catalog",
+)
+
+_enabled = False
+_stats = {}  # navn -> _Stat
+# record kalles også fra bakgrunnstråder (autolagring), mens GUI-tråden
+# måler og leser samtidig
+_stats_lock = threading.Lock()
+
+
+class _Stat:
+    __slots__ = ("calls", "total", "max", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def add(self, secs):
+        self.calls += 1
+        self.total += secs
+        if secs > self.max:
+            self.max = secs
+        self.samples.append(secs)
+
+    def p95(self):
+        s = sorted(self.samples)
+        return s[min(len(s) - 1, int(0.95 * len(s)))] if s else 0.0
+
+
+def enabled():
+    return _enabled
+
+
+def record(name, secs):
+    """Legg til én måling (sekunder) for name."""
+    with _stats_lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = _Stat()
+        stat.add(secs)
+
+
+def timed(name):
+    """Dekoratør: mål hvert kall til funksjonen under navnet name når profilering er på."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - t0)
+        wrapper.__wrapped_timed__ = True
+        return wrapper
+    return deco
+
+
+def instrument(cls, methods, prefix=None):
+    """Pakk inn metodene på klassen cls med @timed (én gang). Gjelder alle instanser."""
+    prefix = prefix or cls.__name__
+    for m in methods:
+        fn = cls.__dict__.get(m)
+        if fn is None or getattr(fn, "__wrapped_timed__", False):
+            continue
+        setattr(cls, m, timed(f"{prefix}.{m}")(fn))
+
+
+def enable():
+    """Slå på målingene (og pakk inn Model-metodene)."""
+    global _enabled
+    from studieplan_core import Model
+    instrument(Model, MODEL_METHODS)
+    _enabled = True
+
+
+def disable():
+    """Slå av målingene. Det som er målt så langt, beholdes."""
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+def enable_from_env():
+    """Slå på målingene hvis STUDIEPLAN_PROFILE er satt. Er verdien et filnavn
+    (ikke "1"), skrives målingene dit ved avslutning. Gir True hvis påslått."""
+    value = os.environ.get(ENV_VAR, "").strip()
+    if not value or value == "0":
+        return False
+    enable()
+    if value != "1":
+        atexit.register(export_json, value)
+    return True
+
+
+def stats():
+    """{navn: {calls, total_s, mean_s, p95_s, max_s}}, sortert etter samlet tid."""
+    with _stats_lock:
+        rows = [(name, s.calls, s.total, s.p95(), s.max) for name, s in _stats.items()]
+    rows.sort(key=lambda r: r[2], reverse=True)
+    return {
+        name: {
+            "calls": calls,
+            "total_s": total,
+            "mean_s": total / calls,
+            "p95_s": p95,
+            "max_s": mx,
+        }
+        for name, calls, total, p95, mx in rows
+    }
+
+
+def _fmt(secs):
+    if secs < 1e-3:
+        return f"{secs * 1e6:.1f} µs"
+    if secs < 1:
+        return f"{secs * 1e3:.2f} ms"
+    return f"{secs:.2f} s"
+
+
+def format_table():
+    """Målingene som tekstlinjer (for terminalen og GUI-panelet)."""
+    data = stats()
+    if not data:
+        return ["(ingen målinger)"]
+    lines = [f"{'målepunkt':<36}{'kall':>9}{'samlet':>12}{'snitt':>12}{'p95':>12}{'maks':>12}"]
+    for name, s in data.items():
+        lines.append(f"{name:<36}{s['calls']:>9}{_fmt(s['total_s']):>12}{_fmt(s['mean_s']):>12}"
+                     f"{_fmt(s['p95_s']):>12}{_fmt(s['max_s']):>12}")
+    return lines
+
+
+def export_json(path):
+    """Skriv målingene til path som JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "stats": stats()}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,303 @@
+# -----------------------------------------------------
+# Studieplan – tjenermodus (JSON-RPC over en lokal socket)
+# Holder én Model i minnet og lar flere verktøy bruke den samtidig, i stedet
+# for at hvert verktøy leser og skriver planfila selv.
+#
+#   python studieplan_server.py --plan studieplan.json --port 8765
+#
+# Protokoll: JSON-RPC 2.0, én JSON-melding per linje. Eksempel:
+#   -> {"jsonrpc": "2.0", "id": 1, "method": "add_course", "params": {"kode": "MAT100", "semester": "høst", "stp": 10}}
+#   <- {"jsonrpc": "2.0", "id": 1, "result": {"id": 1, "kode": "MAT100", "semester": "høst", "stp": 10}}
+#
+# Alle forespørsler behandles samtidig (også flere fra samme klient), men
+# endringer i modellen tas én om gangen bak en lås. Lesing og lagring til
+# fil skjer i en egen tråd, så tjeneren svarer på andre kall imens.
+# -----------------------------------------------------
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import sys
+
+from studieplan_catalog import is_catalog_path, open_catalog, save_catalog
+from studieplan_core import Model
+from studieplan_io import load_plan, save_plan
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+LIMIT = 1 << 24  # største melding (byte)
+
+# JSON-RPC-feilkoder
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+MODEL_ERROR = 1  # regelbrudd i modellen (ValueError), meldingen er til brukeren
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def _load_model(path):
+    # Les en plan inn i en ny Model (kjøres i en egen tråd)
+    model = Model()
+    if is_catalog_path(path):
+        open_catalog(model, path)
+    else:
+        load_plan(model, path)
+    return model
+
+
+def _save(snap, path, compact):
+    if is_catalog_path(path):
+        return save_catalog(snap, path)
+    return save_plan(snap, path, compact=compact)
+
+
+class PlanService:
+    """Metodene tjeneren tilbyr. Hver metode gir noe som kan gjøres om til JSON."""
+
+    def __init__(self, model=None, path=None, root=None):
+        self.model = model or Model()
+        self.path = path  # standard fil for load/save
+        # Klientene er ikke logget inn, så load/save får bare bruke planfila
+        # (path) eller filer i mappa root hvis den er satt
+        self.root = os.path.realpath(root) if root else None
+        self._plan_file = os.path.realpath(path) if path else None
+        self.lock = asyncio.Lock()  # endringer og innlasting, én om gangen
+
+    # ----- Lesing (ingen lås: modellen endres bare mellom to await) -----
+    def validate_plan(self):
+        return [{"semester": i + 1, "stp": tot} for i, tot in self.model.validate_plan()]
+
+    def validate_order(self):
+        """Emner med krav som ikke ligger i et tidligere semester."""
+        get = self.model.get_course
+        return [{"emne": get(cid).kode, "krav": [get(k).kode for k in krav]}
+                for cid, krav in self.model.validate_order()]
+
+    def get_plan(self):
+        m = self.model
+        return {
+            "semesters": [{"semester": i + 1, "arstid": m.term_for_semester_index(i),
+                           "stp": m.total_credits(i), "emner": list(ids)} for i, ids in enumerate(m.plan)],
+            "target": m.shape.target,
+        }
+
+    def find_course(self, kode):
+        c = self.model.find_course_by_code(kode)
+        return c.to_dict() if c else None
+
+    def search_courses(self, prefix, limit=50):
+        return [c.to_dict() for c in self.model.search_courses(prefix)[:limit]]
+
+    def _sem_idx(self, semester):
+        # Semestre nummereres fra 1 i protokollen, som i brukergrensesnittene
+        n = self.model.shape.semesters
+        if not isinstance(semester, int) or not 1 <= semester <= n:
+            raise ValueError(f"Semester må være et heltall fra 1 til {n}.")
+        return semester - 1
+
+    # ----- Endringer (tas én om gangen) -----
+    def add_course(self, kode, semester, stp, krav=()):
+        """krav er emnekoder som må ligge i et tidligere semester."""
+        return self.model.add_course(kode, semester, stp, self.model.ids_for_codes(krav)).to_dict()
+
+    def set_prerequisites(self, kode, krav):
+        c = self.model.find_course_by_code(kode)
+        if not c:
+            raise ValueError(f"Fant ikke emnet {kode}.")
+        return self.model.set_prerequisites(c.id, self.model.ids_for_codes(krav)).to_dict()
+
+    def add_course_to_semester(self, id, semester):
+        """Legg emnet med id i semester (1..n). Gir ny sum stp i semesteret."""
+        idx = self._sem_idx(semester)
+        self.model.add_course_to_semester(id, idx)
+        return self.model.total_credits(idx)
+
+    def remove_course_from_semester(self, id, semester):
+        idx = self._sem_idx(semester)
+        self.model.remove_course_from_semester(id, idx)
+        return self.model.total_credits(idx)
+
+    def apply_batch(self, remove=(), place=()):
+        """Ta ut og legg inn mange emner samlet ([{"id", "semester"}, ...]); alt eller
+        ingenting. Gir ny sum stp per semester."""
+        try:
+            removals = [(r["id"], self._sem_idx(r["semester"]) if r.get("semester") is not None else None)
+                        for r in remove]
+            placements = [(p["id"], self._sem_idx(p["semester"])) for p in place]
+        except (KeyError, TypeError, AttributeError):
+            raise TypeError("remove og place må være lister med {\"id\", \"semester\"}.") from None
+        self.model.apply_batch(removals, placements)
+        return self.model.credit_totals()
+
+    # ----- Filer -----
+    def _allowed_path(self, path):
+        path = path or self.path
+        if not path:
+            raise ValueError("Ingen fil oppgitt.")
+        if not isinstance(path, str):
+            raise TypeError("path må være en streng.")
+        real = os.path.realpath(path)
+        if real == self._plan_file:
+            return path
+        if self.root and os.path.dirname(real) == self.root:
+            return real
+        if self.root:
+            raise ValueError(f"Bare filer i {self.root} kan brukes.")
+        raise ValueError("Bare planfila tjeneren ble startet med kan brukes.")
+
+    async def load(self, path=None):
+        path = self._allowed_path(path)
+        async with self.lock:
+            # Les inn i en ny modell i en egen tråd og bytt den inn til slutt, så
+            # lesende kall imens ser den gamle planen i stedet for en halv ny
+            model = await asyncio.to_thread(_load_model, path)
+            self.model = model
+            self.path = path
+        return {"emner": len(model.courses)}
+
+    async def save(self, path=None, compact=False):
+        path = self._allowed_path(path)
+        async with self.lock:
+            snap = self.model.snapshot()  # rask kopi; skrivingen skjer utenfor låsen
+        secs = await asyncio.to_thread(_save, snap, path, compact)
+        self.path = path
+        return {"fil": path, "sekunder": secs}
+
+
+READS = ("validate_plan", "validate_order", "get_plan", "find_course", "search_courses")
+WRITES = ("add_course", "set_prerequisites", "add_course_to_semester", "remove_course_from_semester", "apply_batch")
+FILES = ("load", "save")
+
+
+async def dispatch(service, method, params):
+    if method not in READS + WRITES + FILES:
+        raise RpcError(METHOD_NOT_FOUND, f"Ukjent metode: {method}")
+    fn = getattr(service, method)
+    if params is None:
+        args, kwargs = (), {}
+    elif isinstance(params, list):
+        args, kwargs = params, {}
+    elif isinstance(params, dict):
+        args, kwargs = (), params
+    else:
+        raise RpcError(INVALID_PARAMS, "params må være en liste eller et objekt.")
+    try:
+        if method in FILES:
+            return await fn(*args, **kwargs)
+        if method in WRITES:
+            async with service.lock:
+                return fn(*args, **kwargs)
+        return fn(*args, **kwargs)
+    except TypeError as e:
+        raise RpcError(INVALID_PARAMS, str(e)) from None
+    except (ValueError, OSError) as e:
+        raise RpcError(MODEL_ERROR, str(e)) from None
+
+
+async def _handle_line(service, line, writer):
+    rid = None
+    notify = False  # varsling (uten "id"): ikke noe svar, heller ikke på feil
+    try:
+        try:
+            req = json.loads(line)
+        except ValueError:
+            raise RpcError(PARSE_ERROR, "Ugyldig JSON.") from None
+        if not isinstance(req, dict) or not isinstance(req.get("method"), str):
+            raise RpcError(INVALID_REQUEST, "Forespørselen må være et objekt med 'method'.")
+        rid = req.get("id")
+        notify = "id" not in req
+        result = await dispatch(service, req["method"], req.get("params"))
+        if notify:
+            return
+        resp = {"jsonrpc": "2.0", "id": rid, "result": result}
+    except RpcError as e:
+        if notify:
+            return
+        resp = {"jsonrpc": "2.0", "id": rid, "error": {"code": e.code, "message": str(e)}}
+    except Exception as e:  # feil i tjeneren; klienten skal likevel få svar
+        if notify:
+            return
+        resp = {"jsonrpc": "2.0", "id": rid, "error": {"code": -32603, "message": f"Intern feil: {e}"}}
+    writer.write(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def handle_client(service, reader, writer):
+    tasks = set()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            # Hver forespørsel i sin egen oppgave: et tregt kall blokkerer ikke de neste
+            task = asyncio.create_task(_handle_line(service, line, writer))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass  # klienten forsvant, eller en linje var lengre enn LIMIT
+    finally:
+        writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """Kjør tjeneren til den avbrytes. ready(port) kalles når den lytter."""
+    server = await asyncio.start_server(lambda r, w: handle_client(service, r, w), host, port, limit=LIMIT)
+    async with server:
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+
+def _is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # vertsnavn: kan peke hvor som helst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Del én studieplan mellom flere verktøy over JSON-RPC.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"lokal adresse å lytte på (default: {DEFAULT_HOST}; andre enn 127.0.0.1, ::1 og localhost avvises)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT}, 0 = velg ledig)")
+    parser.add_argument("--plan", help="planfil (.json eller .spcat) som lastes ved oppstart og brukes av load/save")
+    parser.add_argument("--dir", help="mappe der load/save også kan bruke andre filer (default: bare --plan)")
+    args = parser.parse_args(argv)
+    # Tjeneren har ingen innlogging: alle som når porten kan endre og lagre planen
+    if not _is_loopback(args.host):
+        parser.error(f"--host {args.host} er ikke en lokal adresse; tjeneren har ingen tilgangskontroll "
+                     "og kan bare lytte på 127.0.0.1, ::1 eller localhost.")
+
+    model = Model()
+    if args.plan and os.path.exists(args.plan):
+        try:
+            model = _load_model(args.plan)
+        except Exception as e:
+            print("❌", e, file=sys.stderr)
+            return 1
+
+    def ready(port):
+        print(f"Lytter på {args.host}:{port} ({len(model.courses)} emner). Ctrl+C avslutter.", file=sys.stderr)
+
+    try:
+        asyncio.run(serve(PlanService(model, args.plan, args.dir), args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
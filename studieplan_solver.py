@@ -0,0 +1,350 @@
+# -----------------------------------------------------
+# Studieplan – automatisk planlegging
+# Fyller alle semestre til nøyaktig stp-målet (30 i standardplanen) med emner
+# som ikke ligger i planen.
+# Høst- og våremner kan aldri havne i samme semester, så de to årstidene
+# løses hver for seg. Emner med like mange stp er likeverdige, så søket
+# jobber på "hvor mange emner med v stp i hvert semester" i stedet for på
+# enkeltemner. Det holder søkerommet lite selv med flere hundre emner.
+# can_fill svarer bare på om det går, og brukes av Model.placement_options.
+# count_plan teller alle gyldige planer eksakt med en tabell over stp igjen
+# per semester (_Counts), fylt nedenfra én stp-verdi om gangen, og iter_plan
+# lister dem én om gangen uten å lage dem alle først.
+# -----------------------------------------------------
+from bisect import bisect_left
+from itertools import combinations
+from math import comb
+
+ALWAYS, SOMETIMES, NEVER = "alltid", "noen ganger", "aldri"
+
+
+def _reachable(values, counts, cap):
+    """Bitsett over summer (0..cap) som kan nås med emnene i values/counts."""
+    mask = (1 << (cap + 1)) - 1
+    bits = 1
+    for v, n in zip(values, counts):
+        for _ in range(min(n, cap // v)):
+            bits = (bits | (bits << v)) & mask
+    return bits
+
+
+def _choices(v, n, rems, reach=-1):
+    # Alle måter å fordele inntil n emner med v stp på semestrene, flest først.
+    # reach: bitsett over summer resten av emnene kan nå; andre valg hoppes over.
+    if not rems:
+        yield ()
+        return
+    for k in range(min(n, rems[0] // v), -1, -1):
+        if (reach >> (rems[0] - k * v)) & 1:
+            for rest in _choices(v, n - k, rems[1:], reach):
+                yield (k,) + rest
+
+
+def _pruner(values, counts, rems):
+    # For hvert suffiks: samlet stp og hvilke summer som kan nås. Gir en
+    # funksjon som avviser grener (og hele problemet) uten å søke.
+    cap = sum(rems)
+    totals = [0] * (len(values) + 1)
+    reach = [1] * (len(values) + 1)
+    for i in range(len(values) - 1, -1, -1):
+        totals[i] = totals[i + 1] + values[i] * counts[i]
+        reach[i] = _reachable(values[i:], counts[i:], cap)
+
+    def hopeless(i, rems):
+        r = reach[i]
+        return sum(rems) > totals[i] or not (r >> sum(rems)) & 1 or any(not (r >> x) & 1 for x in rems)
+    return hopeless, reach
+
+
+def _search_counts(values, counts, rems):
+    """Hvor mange emner med values[i] stp hvert semester skal ha, slik at
+    semester b får nøyaktig rems[b] stp. Gir én tuppel per verdi, eller None."""
+    hopeless, reach = _pruner(values, counts, rems)
+    failed = set()
+
+    def search(i, rems):
+        if not any(rems):
+            return []
+        if i == len(values):
+            return None
+        if hopeless(i, rems):
+            return None
+        key = (i, tuple(sorted(rems)))
+        if key in failed:
+            return None
+        v = values[i]
+        for ks in _choices(v, counts[i], rems, reach[i + 1]):
+            rest = search(i + 1, tuple(x - k * v for x, k in zip(rems, ks)))
+            if rest is not None:
+                return [ks] + rest
+        failed.add(key)
+        return None
+
+    return search(0, tuple(rems))
+
+
+def can_fill(counts, rems):
+    """True hvis emner med counts ({stp: antall}, samme årstid) kan fylle hvert
+    semester b med nøyaktig rems[b] stp."""
+    if any(r < 0 for r in rems):
+        return False
+    if not any(rems):
+        return True
+    values = sorted((v for v, n in counts.items() if n > 0), reverse=True)
+    return _search_counts(values, [counts[v] for v in values], rems) is not None
+
+
+def _sorted_states(bounds, reach):
+    # Alle stigende tupler t med t[b] <= bounds[b] (bounds stigende) og bare
+    # summer i bitsettet reach, etter sum
+    states = [()]
+    for bound in bounds:
+        states = [t + (x,) for t in states for x in range(t[-1] if t else 0, bound + 1) if (reach >> x) & 1]
+    states.sort(key=sum)
+    return states
+
+
+class _Counts:
+    """Antall måter å fylle stp som gjenstår i semestrene i én årstid, for
+    alle gjenstående summer på én gang (dynamisk programmering nedenfra).
+
+    Semestrene i en årstid er like, så antallet avhenger bare av hvilke summer
+    som gjenstår, ikke av rekkefølgen: tabellene har én plass per sortert
+    tuppel under rems, og bare summer emnene kan nå i ett semester (andre
+    gir alltid 0). Emnene legges til én stp-verdi om gangen, og hvert steg
+    ser på ett semester om gangen, så arbeidet vokser lineært med antall
+    semestre (men antall tilstander gjør det ikke).
+    """
+
+    def __init__(self, values, counts, rems):
+        self.states = _sorted_states(sorted(rems), _reachable(values, counts, max(rems, default=0)))
+        self.index = {t: k for k, t in enumerate(self.states)}
+        self._preds = {}  # v -> forgjengerne til hver tilstand (se _pred)
+        table = [0] * len(self.states)
+        table[0] = 1  # ingenting igjen å fylle: én måte
+        self.tables = [table]  # tables[i]: med emnene med values[i:] stp
+        for v, n in zip(reversed(values), reversed(counts)):
+            table = self._add(table, v, n)
+            self.tables.append(table)
+        self.tables.reverse()
+
+    def _pred(self, v):
+        # For hver tilstand: tilstandene etter at ett emne med v stp er lagt i
+        # ett av semestrene (ett per semester, også når summene er like).
+        # Tilstander som ikke er med, har alltid 0 og hoppes over.
+        preds = self._preds.get(v)
+        if preds is None:
+            index = self.index
+            preds = self._preds[v] = [
+                [k for k in (index.get(tuple(sorted(t[:b] + (x - v,) + t[b + 1:]))) for b, x in enumerate(t) if x >= v)
+                 if k is not None]
+                for t in self.states
+            ]
+        return preds
+
+    def _add(self, table, v, n):
+        # (1 + S)^n = sum over j av comb(n, j) * S^j, der S legger ett emne med v
+        # stp i ett av semestrene. S^j teller rekkefølgene, og comb(n, j) * S^j
+        # gir nøyaktig n!/(k1!·k2!·…·(n-j)!) for hver fordeling k av de j emnene.
+        # Tilstander med sum under j·v har ikke plass til j emner og er 0 i
+        # S^j, så hvert lag begynner der summen er stor nok (sortert på sum).
+        preds = self._pred(v)
+        sums = [sum(t) for t in self.states]
+        result = list(table)
+        layer = table
+        for j in range(1, min(n, sums[-1] // v) + 1):
+            lo = bisect_left(sums, j * v)
+            layer = [0] * lo + [sum([layer[p] for p in ps]) for ps in preds[lo:]]
+            if not any(layer):
+                break
+            c = comb(n, j)
+            result[lo:] = [r + c * x for r, x in zip(result[lo:], layer[lo:])]
+        return result
+
+    def count(self, i, rems):
+        """Antall måter å fylle rems nøyaktig med emnene med values[i:] stp."""
+        k = self.index.get(tuple(sorted(rems)))
+        return 0 if k is None else self.tables[i][k]
+
+    def without(self, v, rems):
+        """Antall måter å fylle rems med ett emne med v stp mindre. Stegene
+        (1 + S) for hver verdi kan byttes om, så det holder å ta bort ett:
+        G = F - S·G, regnet i stigende sum."""
+        top = self.index.get(tuple(sorted(rems)))
+        if top is None:
+            return 0
+        preds = self._pred(v)
+        table = self.tables[0]
+        g = []
+        for k, ps in enumerate(preds):
+            g.append(table[k] - sum([g[p] for p in ps]))
+        return g[top]
+
+
+def _pick(pool, ks, b=0):
+    # Alle måter å velge ks[b] emner fra pool til semester b, ett valg om gangen
+    if b == len(ks):
+        yield []
+        return
+    for chosen in combinations(pool, ks[b]):
+        taken = set(chosen)
+        rest = [c for c in pool if c not in taken]
+        for more in _pick(rest, ks, b + 1):
+            yield [(c, b) for c in chosen] + more
+
+
+class _Term:
+    # Emnene utenfor planen og stp igjen i semestrene for én årstid
+    def __init__(self, sems, rems, free):
+        self.sems = sems
+        self.rems = tuple(rems)
+        self.pools = {}
+        for c in free:
+            self.pools.setdefault(c.stp, []).append(c)
+        self.values = sorted(self.pools, reverse=True)
+        self.counts = [len(self.pools[v]) for v in self.values]
+        self._counts = None  # _Counts, regnes ut ved første spørsmål
+
+    def _table(self):
+        if self._counts is None:
+            self._counts = _Counts(self.values, self.counts, self.rems)
+        return self._counts
+
+    def count(self, without=None):
+        """Antall måter å fylle semestrene. without: ett emne med så mange stp er tatt bort."""
+        if any(r < 0 for r in self.rems):
+            return 0
+        if without is None:
+            return self._table().count(0, self.rems)
+        return self._table().without(without, self.rems)
+
+    def walk(self):
+        """Alle måter å fylle semestrene, som lister med (emne, semesterindeks)."""
+        if any(r < 0 for r in self.rems):
+            return
+        values, pools, sems = self.values, self.pools, self.sems
+        count = self._table().count
+        reach = _pruner(values, self.counts, self.rems)[1]
+
+        def walk(i, rems):
+            if not any(rems):
+                yield []
+                return
+            if not count(i, rems):
+                return  # ingen gyldig plan herfra: ikke let videre
+            v = values[i]
+            pool = pools[v]
+            for ks in _choices(v, len(pool), rems, reach[i + 1]):
+                rest = tuple(x - k * v for x, k in zip(rems, ks))
+                if not count(i + 1, rest):
+                    continue
+                for picked in _pick(pool, ks):
+                    for more in walk(i + 1, rest):
+                        yield [(c.id, sems[b]) for c, b in picked] + more
+
+        yield from walk(0, self.rems)
+
+
+def _terms(model):
+    terms = []
+    for term in ("høst", "vår"):
+        sems = [i for i in range(len(model.plan)) if model.term_for_semester_index(i) == term]
+        rems = [model.shape.target - model.total_credits(i) for i in sems]
+        free = [c for c in model.courses if c.semester == term and not model.course_in_plan(c.id)]
+        terms.append(_Term(sems, rems, free))
+    return terms
+
+
+def count_plan(model):
+    """Antall gyldige planer: måter å legge emner utenfor planen i semestrene slik at
+    alle får nøyaktig stp-målet. Emner i planen blir liggende; krav telles ikke med."""
+    autumn, spring = _terms(model)
+    return autumn.count() * spring.count()
+
+
+def iter_plan(model, limit=None):
+    """Gyldige planer (se count_plan) én om gangen, hver som en liste med
+    (course_id, semesterindeks) som fullfører planen. Høyst limit planer.
+
+    Emnene leses med en gang; planene lages først når de hentes.
+    """
+    autumn, spring = _terms(model)
+
+    def plans():
+        if not autumn.count() or not spring.count():
+            return
+        n = 0
+        for a in autumn.walk():
+            # Vårsemestrene listes på nytt for hvert høstvalg i stedet for å huskes
+            for b in spring.walk():
+                if limit is not None and n >= limit:
+                    return
+                n += 1
+                yield a + b
+
+    return plans()
+
+
+def placement_flags(model):
+    """{course_id: ALWAYS, SOMETIMES eller NEVER}: om emnet er med i alle, noen
+    eller ingen av de gyldige planene (se count_plan)."""
+    autumn, spring = _terms(model)
+    n_autumn, n_spring = autumn.count(), spring.count()
+    total = n_autumn * n_spring
+    flags = {}
+    for term, other in ((autumn, n_spring), (spring, n_autumn)):
+        for v, pool in term.pools.items():
+            # Emner med like mange stp i samme årstid er likeverdige: tell
+            # planene uten ett av dem, én gang per stp-verdi
+            with_it = total - term.count(without=v) * other
+            flag = NEVER if not with_it else ALWAYS if with_it == total else SOMETIMES
+            for c in pool:
+                flags[c.id] = flag
+    placed = ALWAYS if total else NEVER
+    for sem in model.plan:
+        for cid in sem:
+            flags[cid] = placed
+    return flags
+
+
+def solve_term(courses, rems):
+    """Fordel emner (samme årstid) slik at semester b får nøyaktig rems[b] stp.
+
+    Returnerer én liste med emner per semester, eller None hvis det er umulig.
+    """
+    if not any(rems):
+        return [[] for _ in rems]
+    by_value = {}
+    for c in courses:
+        by_value.setdefault(c.stp, []).append(c)
+    values = sorted(by_value, reverse=True)
+    steps = _search_counts(values, [len(by_value[v]) for v in values], rems)
+    if steps is None:
+        return None
+    result = [[] for _ in rems]
+    for v, ks in zip(values, steps):
+        pool = iter(by_value[v])
+        for b, k in enumerate(ks):
+            result[b].extend(next(pool) for _ in range(k))
+    return result
+
+
+def solve_plan(model):
+    """Finn plasseringer som gir nøyaktig stp-målet i alle semestre.
+
+    Emner som allerede ligger i planen blir liggende. Returnerer en liste med
+    (course_id, semesterindeks), eller None hvis ingen gyldig plan finnes.
+    """
+    placements = []
+    for term in ("høst", "vår"):
+        sems = [i for i in range(len(model.plan)) if model.term_for_semester_index(i) == term]
+        rems = [model.shape.target - model.total_credits(i) for i in sems]
+        if any(r < 0 for r in rems):
+            return None
+        free = [c for c in model.courses if c.semester == term and not model.course_in_plan(c.id)]
+        filled = solve_term(free, rems)
+        if filled is None:
+            return None
+        for sem_idx, chosen in zip(sems, filled):
+            placements.extend((c.id, sem_idx) for c in chosen)
+    return placements
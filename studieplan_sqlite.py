@@ -0,0 +1,189 @@
+# -----------------------------------------------------
+# Studieplan – lagring i SQLite
+# En plan kan ligge i en SQLite-fil (.sqlite/.db) i stedet for JSON. Som med
+# journalen skrives hver endring i modellen straks til disk, men her som én
+# liten transaksjon mot databasen (én rad inn/ut) i stedet for en logglinje.
+# Den unike indeksen på emnekode passer på at ingen kode finnes to ganger, og
+# indeksen på plasseringene gjør at "sist i semesteret" og tømming av et
+# semester ikke trenger å lese hele planen.
+#
+# Modellen i minnet er fortsatt fasiten; databasen speiler den. JSON-import
+# og -eksport går via de vanlige filene: åpne en JSON-plan og lagre som .sqlite,
+# eller åpne en .sqlite og lagre som .json.
+# -----------------------------------------------------
+import json
+import os
+import time
+
+from studieplan_core import Course, PlanShape
+from studieplan_profile import timed
+
+SUFFIXES = (".sqlite", ".sqlite3", ".db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value NOT NULL                   -- uten type: next_id er et tall, "shape" er planformen som JSON-tekst
+);
+CREATE TABLE IF NOT EXISTS courses (
+    id       INTEGER PRIMARY KEY,
+    kode     TEXT NOT NULL,
+    kode_key TEXT NOT NULL,          -- kode.lower(), samme regel som i modellen
+    semester TEXT NOT NULL,
+    stp      INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS courses_kode ON courses (kode_key);
+DROP INDEX IF EXISTS courses_semester;  -- fra eldre filer: bare to verdier (høst/vår)
+CREATE TABLE IF NOT EXISTS placements (
+    course_id INTEGER PRIMARY KEY REFERENCES courses (id) ON DELETE CASCADE,
+    sem       INTEGER NOT NULL,
+    pos       INTEGER NOT NULL       -- rekkefølgen i semesteret
+);
+CREATE INDEX IF NOT EXISTS placements_sem ON placements (sem, pos);
+CREATE TABLE IF NOT EXISTS prerequisites (
+    course_id INTEGER NOT NULL REFERENCES courses (id) ON DELETE CASCADE,
+    krav_id   INTEGER NOT NULL REFERENCES courses (id) ON DELETE CASCADE,
+    pos       INTEGER NOT NULL,      -- rekkefølgen i Course.krav
+    PRIMARY KEY (course_id, krav_id)
+);
+"""
+
+_INSERT_COURSE = "INSERT INTO courses (id, kode, kode_key, semester, stp) VALUES (?, ?, ?, ?, ?)"
+_SET_NEXT_ID = "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)"
+_SET_SHAPE = "INSERT OR REPLACE INTO meta (key, value) VALUES ('shape', ?)"
+_INSERT_KRAV = "INSERT INTO prerequisites (course_id, krav_id, pos) VALUES (?, ?, ?)"
+# Sist i semesteret: (course_id, sem, sem)
+_PLACE = ("INSERT INTO placements (course_id, sem, pos) "
+          "SELECT ?, ?, COALESCE(MAX(pos) + 1, 0) FROM placements WHERE sem = ?")
+
+
+def is_sqlite_path(path):
+    return path.lower().endswith(SUFFIXES)
+
+
+def _row(c):
+    return (c.id, c.kode, c.kode.lower(), c.semester, c.stp)
+
+
+def _krav_rows(courses):
+    return ((c.id, k, pos) for c in courses for pos, k in enumerate(c.krav))
+
+
+def _connect(path):
+    import sqlite3  # importeres først når en SQLite-fil brukes
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    # WAL: en skriving er én liten append i stedet for å skrive om sider to ganger
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+class SqliteStore:
+    """Skriver hver endring i modellen til en SQLite-fil. Samme grensesnitt som Journal."""
+
+    def __init__(self, model, path):
+        self.model = model
+        self.path = path
+        self.conn = None
+
+    @classmethod
+    @timed("sqlite.open")
+    def open(cls, model, path):
+        """Les en plan fra en SQLite-fil og fortsett å lagre endringer dit.
+
+        Returnerer (lager, sekunder brukt på innlasting).
+        """
+        t0 = time.perf_counter()
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        store = cls(model, path)
+        store.conn = _connect(path)
+        try:
+            found = store.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'courses'").fetchone()
+            if not found:
+                raise ValueError(f"{path} er ikke en studieplan-database.")
+            store.conn.executescript(SCHEMA)  # oppdater indeksene i eldre filer
+            row = store.conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+            shape_row = store.conn.execute("SELECT value FROM meta WHERE key = 'shape'").fetchone()
+            shape = PlanShape.from_dict(json.loads(shape_row[0]) if shape_row else None)
+            krav = {}
+            for cid, k in store.conn.execute("SELECT course_id, krav_id FROM prerequisites ORDER BY course_id, pos"):
+                krav.setdefault(cid, []).append(k)
+            courses = [Course(cid, kode, sem, stp, tuple(krav.get(cid, ()))) for cid, kode, sem, stp
+                       in store.conn.execute("SELECT id, kode, semester, stp FROM courses ORDER BY id")]
+            plan = [[] for _ in range(shape.semesters)]
+            for cid, sem in store.conn.execute("SELECT course_id, sem FROM placements ORDER BY sem, pos"):
+                if 0 <= sem < len(plan):
+                    plan[sem].append(cid)
+        except Exception:
+            store.conn.close()
+            raise
+        model.load_parsed(row[0] if row else 1, courses, plan, shape)
+        model.subscribe(store._on_event)
+        return store, time.perf_counter() - t0
+
+    def start(self):
+        """Skriv hele modellen til en ny (eller tømt) database og begynn å lagre endringer.
+
+        Returnerer sekunder.
+        """
+        self.conn = _connect(self.path)
+        self.conn.executescript(SCHEMA)
+        secs = self.compact()
+        self.model.subscribe(self._on_event)
+        return secs
+
+    @timed("sqlite.compact")
+    def compact(self):
+        """Skriv hele modellen på nytt i én transaksjon. Returnerer sekunder."""
+        t0 = time.perf_counter()
+        with self.conn:
+            self.conn.execute("DELETE FROM placements")
+            self.conn.execute("DELETE FROM prerequisites")
+            self.conn.execute("DELETE FROM courses")
+            self.conn.executemany(_INSERT_COURSE, map(_row, self.model.courses))
+            self.conn.executemany(_INSERT_KRAV, _krav_rows(self.model.courses))
+            self.conn.executemany(
+                "INSERT INTO placements (course_id, sem, pos) VALUES (?, ?, ?)",
+                ((cid, sem, pos) for sem, ids in enumerate(self.model.plan) for pos, cid in enumerate(ids)))
+            self.conn.execute(_SET_NEXT_ID, (self.model.next_id,))
+            self.conn.execute(_SET_SHAPE, (json.dumps(self.model.shape.to_dict(), ensure_ascii=False),))
+        return time.perf_counter() - t0
+
+    def close(self):
+        self.model.unsubscribe(self._on_event)
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @timed("sqlite.write")
+    def _on_event(self, event, data):
+        if event == "loaded":
+            self.compact()  # hele modellen er byttet ut
+            return
+        # Én transaksjon per endring: enten er hele endringen lagret, eller ingenting
+        with self.conn:
+            if event == "course_added":
+                self.conn.execute(_INSERT_COURSE, _row(data["course"]))
+                self.conn.executemany(_INSERT_KRAV, _krav_rows([data["course"]]))
+                self.conn.execute(_SET_NEXT_ID, (self.model.next_id,))
+            elif event == "courses_added":
+                self.conn.executemany(_INSERT_COURSE, map(_row, data["courses"]))
+                self.conn.execute(_SET_NEXT_ID, (self.model.next_id,))
+            elif event == "course_deleted":
+                # Kravene til og fra emnet forsvinner med ON DELETE CASCADE
+                self.conn.execute("DELETE FROM courses WHERE id = ?", (data["course"].id,))
+            elif event == "prerequisites_set":
+                self.conn.execute("DELETE FROM prerequisites WHERE course_id = ?", (data["course"].id,))
+                self.conn.executemany(_INSERT_KRAV, _krav_rows([data["course"]]))
+            elif event == "placed":
+                self.conn.execute(_PLACE, (data["cid"], data["sem_idx"], data["sem_idx"]))
+            elif event == "unplaced":
+                self.conn.execute("DELETE FROM placements WHERE course_id = ?", (data["cid"],))
+            elif event == "batch_applied":
+                self.conn.executemany("DELETE FROM placements WHERE course_id = ?",
+                                      ((cid,) for cid, _ in data["removed"]))
+                self.conn.executemany(_PLACE, ((cid, sem, sem) for cid, sem in data["placed"]))
+            elif event == "semester_cleared":
+                self.conn.execute("DELETE FROM placements WHERE sem = ?", (data["sem_idx"],))
@@ -1,83 +1,21 @@
-import json
+import argparse
+import os
+import sys
+
+from studieplan_core import TERMS, Model, PlanShape
+import studieplan_profile as profile
 
 # -----------------------------------------------------
 # Studieplan – Terminalversjon
-# 6 semestre, 30 stp per semester,
+# 6 semestre, 30 stp per semester (endres med --semesters/--target/--first),
 #   høst: sem 1/3/5, vår: sem 2/4/6, emner kan kun legges én gang
-# - Lagrer/leser JSON (studieplan.json default)
+# - Lagrer/leser JSON (studieplan.json default), SQLite (.sqlite/.db) eller
+#   binær emnekatalog (.spcat, åpnes skrivebeskyttet)
+# - Modellen og reglene ligger i studieplan_core.py
+# - Lagringsformatene (og multiprocessing/sqlite3) importeres først i
+#   kommandoen som trenger dem, så korte kommandoer starter raskt
 # -----------------------------------------------------
 
-class Model:
-    def __init__(self):
-        self.courses = []  # {id, kode, semester, stp}
-        self._next_id = 1
-        self.plan = [[] for _ in range(6)]  # 6 semestre, holder course_id
-
-    def term_for_semester_index(self, idx):
-        return "høst" if idx in (0, 2, 4) else "vår"
-
-    def add_course(self, kode: str, semester: str, stp: int):
-        if any(c["kode"].lower() == kode.lower() for c in self.courses):
-            raise ValueError(f"Emnekode '{kode}' finnes allerede.")
-        if semester not in ("høst", "vår"):
-            raise ValueError("Semester må være 'høst' eller 'vår'.")
-        if stp <= 0 or stp > 30:
-            raise ValueError("Studiepoeng må være mellom 1 og 30.")
-        c = {"id": self._next_id, "kode": kode.strip(), "semester": semester.strip(), "stp": int(stp)}
-        self._next_id += 1
-        self.courses.append(c)
-        return c
-
-    def get_course(self, cid):
-        return next((c for c in self.courses if c["id"] == cid), None)
-
-    def find_course_by_code(self, kode):
-        return next((c for c in self.courses if c["kode"].lower() == kode.lower()), None)
-
-    def course_in_plan(self, cid):
-        return any(cid in sem for sem in self.plan)
-
-    def total_credits(self, sem_idx):
-        return sum(self.get_course(cid)["stp"] for cid in self.plan[sem_idx])
-
-    def add_course_to_semester(self, cid, sem_idx):
-        c = self.get_course(cid)
-        if not c:
-            raise ValueError("Ugyldig emne.")
-        if self.course_in_plan(cid):
-            raise ValueError("Emnet er allerede i studieplanen.")
-        riktig_term = self.term_for_semester_index(sem_idx)
-        if c["semester"] != riktig_term:
-            allowed = "1/3/5" if c["semester"] == "høst" else "2/4/6"
-            raise ValueError(f"{c['kode']} er et {c['semester']}-emne og kan bare ligge i semester {allowed}.")
-        if self.total_credits(sem_idx) + c["stp"] > 30:
-            raise ValueError(f"Ikke plass i semester {sem_idx+1} (maks 30 stp).")
-        self.plan[sem_idx].append(cid)
-
-    def remove_course_from_semester(self, cid, sem_idx):
-        if cid in self.plan[sem_idx]:
-            self.plan[sem_idx].remove(cid)
-
-    def validate_plan(self):
-        invalid = []
-        for i in range(6):
-            tot = self.total_credits(i)
-            if tot != 30:
-                invalid.append((i, tot))
-        return invalid
-
-    def to_json(self):
-        return {"next_id": self._next_id, "courses": self.courses, "plan": self.plan}
-
-    def load_json(self, data):
-        self._next_id = int(data.get("next_id", 1))
-        self.courses = list(data.get("courses", []))
-        self.plan = [list(s) for s in data.get("plan", [[] for _ in range(6)])]
-        valid_ids = {c["id"] for c in self.courses}
-        for i in range(6):
-            self.plan[i] = [cid for cid in self.plan[i] if cid in valid_ids]
-
-
 # ---------------- Terminal UI ----------------
 
 def print_header():
@@ -89,14 +27,15 @@ def list_courses(model: Model):
         return
     print("\nEmner:")
     for c in model.courses:
-        print(f"- {c['kode']}  ({c['semester']}, {c['stp']} stp)")
+        krav = f", krav: {', '.join(model.get_course(k).kode for k in c.krav)}" if c.krav else ""
+        print(f"- {c['kode']}  ({c['semester']}, {c['stp']} stp{krav})")
 
 def list_plan(model: Model):
     print("\nStudieplan:")
     for i, sem in enumerate(model.plan):
         term = model.term_for_semester_index(i)
         total = model.total_credits(i)
-        print(f"Semester {i+1} ({term}) – {total}/30 stp")
+        print(f"Semester {i+1} ({term}) – {total}/{model.shape.target} stp")
         if not sem:
             print("  (tomt)")
         else:
@@ -110,7 +49,8 @@ def add_course_flow(model: Model):
         kode = input("Emnekode: ").strip()
         semester = input("Semester (høst/vår): ").strip().lower()
         stp = int(input("Studiepoeng: ").strip())
-        model.add_course(kode, semester, stp)
+        krav = model.ids_for_codes(input("Krav (emnekoder, tomt = ingen): "))
+        model.add_course(kode, semester, stp, krav)
         print("✅ Emne lagt til!")
     except Exception as e:
         print("❌", e)
@@ -125,8 +65,9 @@ def add_to_plan_flow(model: Model):
         print("❌ Emne ikke funnet.")
         return
     try:
-        sem = int(input("Semester (1–6): ").strip()) - 1
-        if sem < 0 or sem > 5:
+        n = model.shape.semesters
+        sem = int(input(f"Semester (1–{n}): ").strip()) - 1
+        if sem < 0 or sem >= n:
             print("❌ Ugyldig semester.")
             return
         model.add_course_to_semester(course["id"], sem)
@@ -136,37 +77,94 @@ def add_to_plan_flow(model: Model):
 
 def validate_flow(model: Model):
     invalid = model.validate_plan()
-    if not invalid:
-        print("✅ Studieplanen er gyldig: 30 stp i alle semestre.")
-    else:
-        print("⚠️  Ikke gyldig. Disse semestrene mangler/overskrider 30 stp:")
+    order = model.validate_order()
+    if not invalid and not order:
+        print(f"✅ Studieplanen er gyldig: {model.shape.target} stp i alle semestre.")
+        return
+    if invalid:
+        print(f"⚠️  Ikke gyldig. Disse semestrene mangler/overskrider {model.shape.target} stp:")
         for i, tot in invalid:
             print(f"  - Semester {i+1} ({model.term_for_semester_index(i)}): {tot} stp")
+    if order:
+        print("⚠️  Disse emnene har krav som ikke ligger i et tidligere semester:")
+        for cid, krav in order:
+            print(f"  - {model.get_course(cid).kode}: {', '.join(model.get_course(k).kode for k in krav)}")
+
+def auto_plan_flow(model: Model):
+    try:
+        placements = model.auto_plan()
+    except ValueError as e:
+        print("❌", e)
+        return
+    if not placements:
+        print("Planen er allerede full – ingenting å legge til.")
+        return
+    print(f"✅ La {len(placements)} emner i planen automatisk:")
+    for cid, sem in placements:
+        print(f"  - {model.get_course(cid)['kode']} → semester {sem+1}")
 
-def save_flow(model: Model):
+def save_flow(model: Model, compact=False, journal=None, use_journal=False):
+    """Lagre planen. Returnerer journalen (eller SQLite-lageret) som er i bruk etterpå."""
+    from studieplan_catalog import is_catalog_path, save_catalog
+    from studieplan_io import save_plan
+    from studieplan_journal import Journal
+    from studieplan_sqlite import SqliteStore, is_sqlite_path
     path = input("Filnavn (default: studieplan.json): ").strip() or "studieplan.json"
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(model.to_json(), f, ensure_ascii=False, indent=2)
-        print(f"💾 Lagret til {path}")
+        if journal is not None and journal.path == path:
+            secs = journal.compact()
+        elif is_sqlite_path(path):
+            if journal is not None:
+                journal.close()
+            journal = SqliteStore(model, path)
+            secs = journal.start()
+        elif use_journal:
+            if journal is not None:
+                journal.close()
+            journal = Journal(model, path, compact=compact)
+            secs = journal.start()
+        elif is_catalog_path(path):
+            secs = save_catalog(model, path)
+        else:
+            secs = save_plan(model, path, compact=compact)
+        print(f"💾 Lagret til {path} ({secs:.2f} s)")
     except Exception as e:
         print("❌", e)
+    return journal
 
-def load_flow(model: Model):
+def load_flow(model: Model, compact=False, journal=None):
+    """Les en plan. Journalførte planer og SQLite-planer lagres fortsatt endring for endring."""
+    from studieplan_catalog import is_catalog_path, open_catalog
+    from studieplan_io import load_plan
+    from studieplan_journal import Journal, has_journal
+    from studieplan_sqlite import SqliteStore, is_sqlite_path
     path = input("Filnavn (default: studieplan.json): ").strip() or "studieplan.json"
+    if journal is not None:
+        journal.close()
+        journal = None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        model.load_json(data)
-        print(f"📂 Lest fra {path}")
+        if is_sqlite_path(path):
+            journal, secs = SqliteStore.open(model, path)
+            print(f"📂 Lest fra {path} (SQLite, {secs:.2f} s)")
+        elif is_catalog_path(path):
+            secs = open_catalog(model, path)
+            print(f"📂 Åpnet katalogen {path} ({len(model.courses)} emner, skrivebeskyttet, {secs:.2f} s)")
+        elif has_journal(path):
+            journal, secs = Journal.open(model, path, compact=compact)
+            print(f"📂 Lest fra {path} med journal ({secs:.2f} s)")
+        else:
+            secs = load_plan(model, path)
+            print(f"📂 Lest fra {path} ({secs:.2f} s)")
     except FileNotFoundError:
         print("❌ Fant ikke filen.")
     except Exception as e:
         print("❌", e)
+    return journal
 
 
-def main():
-    model = Model()
+def main(compact=False, use_journal=False, shape=None):
+    model = Model(shape=shape or PlanShape())
+    journal = None
 
     # Eksempeldata (kan fjernes)
     try:
@@ -189,7 +187,8 @@ def main():
         print("5. Sjekk om studieplanen er gyldig")
         print("6. Lagre emnene og studieplanen til fil")
         print("7. Les inn emnene og studieplanen fra fil")
-        print("8. Avslutt")
+        print("8. Lag studieplan automatisk")
+        print("9. Avslutt")
         choice = input("\nVelg: ").strip()
 
         if choice == "1":
@@ -203,14 +202,197 @@ def main():
         elif choice == "5":
             validate_flow(model)
         elif choice == "6":
-            save_flow(model)
+            journal = save_flow(model, compact, journal, use_journal)
         elif choice == "7":
-            load_flow(model)
+            journal = load_flow(model, compact, journal)
         elif choice == "8":
+            auto_plan_flow(model)
+        elif choice == "9":
+            if journal is not None:
+                journal.close()
             print("Ha det!")
             break
         else:
             print("Ugyldig valg.")
 
+# ---------------- Kommandolinje ----------------
+
+def import_command(path, plan_path, compact=False, shape=None):
+    """Importer emner til plan_path. shape brukes bare hvis planfila er ny."""
+    from studieplan_catalog import is_catalog_path, load_catalog, save_catalog
+    from studieplan_import import import_courses
+    from studieplan_io import load_plan, save_plan
+    from studieplan_journal import Journal, has_journal
+    from studieplan_sqlite import SqliteStore, is_sqlite_path
+    model = Model(shape=shape or PlanShape())
+    try:
+        if is_sqlite_path(plan_path):
+            if os.path.exists(plan_path):
+                store, _ = SqliteStore.open(model, plan_path)
+            else:
+                store = SqliteStore(model, plan_path)
+                store.start()
+            added, rejected = import_courses(model, path)
+            store.close()
+        elif has_journal(plan_path):
+            journal, _ = Journal.open(model, plan_path, compact=compact)
+            added, rejected = import_courses(model, path)
+            journal.close()
+        elif is_catalog_path(plan_path):
+            if os.path.exists(plan_path):
+                load_catalog(model, plan_path)
+            added, rejected = import_courses(model, path)
+            save_catalog(model, plan_path)
+        else:
+            if os.path.exists(plan_path):
+                load_plan(model, plan_path)
+            added, rejected = import_courses(model, path)
+            save_plan(model, plan_path, compact=compact)
+    except Exception as e:
+        print("❌", e)
+        return 1
+    print(f"✅ Importerte {added} emner fra {path} til {plan_path}.")
+    if rejected:
+        print(f"⚠️  {len(rejected)} rader ble avvist:")
+        for line_no, msg in rejected[:50]:
+            print(f"  - linje {line_no}: {msg}")
+        if len(rejected) > 50:
+            print(f"  ... og {len(rejected) - 50} til")
+    return 0
+
+def _read_plan(model, plan_path):
+    # Les planfila (alle formater) uten å holde den åpen for endringer
+    from studieplan_catalog import is_catalog_path, open_catalog
+    from studieplan_io import load_plan
+    from studieplan_journal import Journal, has_journal
+    from studieplan_sqlite import SqliteStore, is_sqlite_path
+    if is_sqlite_path(plan_path):
+        SqliteStore.open(model, plan_path)[0].close()
+    elif has_journal(plan_path):
+        Journal.open(model, plan_path)[0].close()
+    elif is_catalog_path(plan_path):
+        open_catalog(model, plan_path)
+    else:
+        load_plan(model, plan_path)
+
+def search_command(prefix, plan_path, limit=50):
+    model = Model()
+    try:
+        _read_plan(model, plan_path)
+    except FileNotFoundError:
+        print("❌ Fant ikke filen.")
+        return 1
+    except Exception as e:
+        print("❌", e)
+        return 1
+    hits = model.search_courses(prefix)
+    if not hits:
+        print(f"Ingen emnekoder starter med '{prefix}'.")
+        return 0
+    for c in hits[:limit]:
+        print(f"- {c['kode']}  ({c['semester']}, {c['stp']} stp)")
+    if len(hits) > limit:
+        print(f"  ... og {len(hits) - limit} til")
+    return 0
+
+def _print_codes(title, codes, limit=50):
+    print(f"{title} ({len(codes)}):")
+    if not codes:
+        print("  (ingen)")
+    for kode in codes[:limit]:
+        print(f"  - {kode}")
+    if len(codes) > limit:
+        print(f"  ... og {len(codes) - limit} til")
+
+def count_command(plan_path, show=0):
+    """Tell gyldige planer som fullfører planen, og vis hvilke emner som alltid,
+    noen ganger eller aldri kan være med. show: skriv også ut så mange planer."""
+    model = Model()
+    try:
+        _read_plan(model, plan_path)
+    except FileNotFoundError:
+        print("❌ Fant ikke filen.")
+        return 1
+    except Exception as e:
+        print("❌", e)
+        return 1
+    n = model.count_plans()
+    exact = f"{n:,}".replace(",", " ")
+    # Ikke via float: antallet kan være langt over 1e308
+    digits = str(n)
+    approx = f" (ca. {digits[0]}.{digits[1:3]}e+{len(digits) - 1:02d})" if n >= 10 ** 9 else ""
+    print(f"📊 {exact} gyldige planer{approx}, regnet fra planen slik den er (emner i planen blir liggende, krav telles ikke med).")
+    flags = model.placement_flags()
+    by_flag = {}
+    for c in sorted(model.courses, key=lambda c: c.kode.lower()):
+        by_flag.setdefault(flags[c.id], []).append(c.kode)
+    _print_codes("Alltid med", by_flag.get("alltid", []))
+    _print_codes("Aldri med", by_flag.get("aldri", []))
+    print(f"Noen ganger med: {len(by_flag.get('noen ganger', []))} emner")
+    for k, placements in enumerate(model.iter_plans(limit=show), 1):
+        added = {}
+        for cid, sem in placements:
+            added.setdefault(sem, []).append(cid)
+        print(f"\nPlan {k}:")
+        for i, sem in enumerate(model.plan):
+            codes = [model.get_course(cid).kode for cid in sem]
+            codes += [model.get_course(cid).kode + "*" for cid in added.get(i, [])]
+            print(f"  Semester {i+1} ({model.term_for_semester_index(i)}): {', '.join(codes) or '(tomt)'}")
+    if show and n:
+        print("(* = lagt til, de andre ligger allerede i planen)")
+    return 0
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="Studieplan i terminalen. Uten kommando startes menyen.")
+    parser.add_argument("--compact", action="store_true", help="lagre planfiler uten innrykk (mindre og raskere)")
+    parser.add_argument("--journal", action="store_true", help="lagre med journal: bare endringene skrives til PLAN.log")
+    parser.add_argument("--profile", action="store_true", help="mål tidsbruk og skriv en tabell ved avslutning")
+    parser.add_argument("--profile-out", metavar="FIL", help="mål tidsbruk og lagre målingene som JSON ved avslutning")
+    parser.add_argument("--semesters", type=int, default=6, help="antall semestre i nye planer (default: 6; master: 4)")
+    parser.add_argument("--target", type=int, default=30, help="stp per semester i nye planer (default: 30)")
+    parser.add_argument("--first", choices=TERMS, default="høst", help="årstiden til første semester (default: høst)")
+    sub = parser.add_subparsers(dest="command")
+    p = sub.add_parser("import", help="importer emner fra CSV eller JSON Lines")
+    p.add_argument("file", help="CSV (kode,semester,stp) eller .jsonl")
+    p.add_argument("--plan", default="studieplan.json", help="planfila emnene legges i, .json eller .sqlite (default: studieplan.json)")
+    p = sub.add_parser("search", help="finn emner der emnekoden starter med PREFIKS")
+    p.add_argument("prefix", help="starten på emnekoden (store/små bokstaver spiller ingen rolle)")
+    p.add_argument("--plan", default="studieplan.json", help="planfila det søkes i (default: studieplan.json)")
+    p.add_argument("--limit", type=int, default=50, help="vis høyst så mange treff (default: 50)")
+    p = sub.add_parser("count", help="tell gyldige planer og vis emner som alltid/aldri kan være med")
+    p.add_argument("--plan", default="studieplan.json", help="planfila (default: studieplan.json)")
+    p.add_argument("--list", type=int, default=0, metavar="N", help="skriv også ut de N første planene")
+    p = sub.add_parser("validate", help="valider alle planfiler (*.json) i en mappe")
+    p.add_argument("directory", help="mappe med planfiler")
+    p.add_argument("--out", help="resultatfil (.csv eller .jsonl); default: skriv CSV til skjermen")
+    p.add_argument("--format", choices=("csv", "jsonl"), help="csv eller jsonl (default: ut fra --out)")
+    p.add_argument("--workers", type=int, help="antall prosesser (default: antall kjerner)")
+    args = parser.parse_args(argv)
+    try:
+        shape = PlanShape.alternating(args.semesters, args.target, args.first)
+    except ValueError as e:
+        parser.error(str(e))
+
+    profile.enable_from_env()
+    if args.profile or args.profile_out:
+        profile.enable()
+    try:
+        if args.command == "import":
+            return import_command(args.file, args.plan, args.compact, shape)
+        if args.command == "search":
+            return search_command(args.prefix, args.plan, args.limit)
+        if args.command == "count":
+            return count_command(args.plan, args.list)
+        if args.command == "validate":
+            from studieplan_batch import validate_command  # multiprocessing trengs bare her
+            return validate_command(args.directory, args.out, args.format, args.workers)
+        main(args.compact, args.journal, shape)
+        return 0
+    finally:
+        if args.profile:
+            print("\n".join(profile.format_table()), file=sys.stderr)
+        if args.profile_out:
+            profile.export_json(args.profile_out)
+
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
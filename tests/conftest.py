@@ -0,0 +1,38 @@
+# Felles oppsett for testene. Modulene ligger flatt i repoet, så mappa over
+# legges først i sys.path.
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from studieplan_core import Model  # noqa: E402
+
+
+def sample_model(shape=None):
+    """Liten plan med krav og noen emner plassert. self_check er på."""
+    m = Model(self_check=True) if shape is None else Model(self_check=True, shape=shape)
+    mat100 = m.add_course("MAT100", "høst", 10)
+    dat120 = m.add_course("DAT120", "høst", 10)
+    m.add_course("FYS102", "høst", 5)
+    m.add_course("KJE101", "høst", 5)
+    m.add_course("MAT200", "vår", 10, krav=(mat100.id,))
+    dat130 = m.add_course("DAT130", "vår", 10, krav=(dat120.id,))
+    m.add_course("ELE130", "vår", 10)
+    m.add_course("Ærø-1", "vår", 5)  # ikke-ASCII i koden
+    autumn, spring = m.shape.terms.index("høst"), m.shape.terms.index("vår")
+    m.add_course_to_semester(mat100.id, autumn)
+    m.add_course_to_semester(dat120.id, autumn)
+    m.add_course_to_semester(dat130.id, spring)
+    return m
+
+
+def same_plan(a, b):
+    """Sammenlign to modeller slik de lagres (emner, plan, form og next_id)."""
+    return a.to_json() == b.to_json()
+
+
+@pytest.fixture
+def model():
+    return sample_model()
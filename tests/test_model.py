@@ -0,0 +1,138 @@
+import threading
+
+import pytest
+
+from studieplan_core import Model, RWLock
+
+
+def _ids(model, *codes):
+    return [model.find_course_by_code(k).id for k in codes]
+
+
+def test_apply_batch_moves_courses(model):
+    events = []
+    model.subscribe(lambda event, data: events.append(event))
+    mat100, mat200 = _ids(model, "MAT100", "MAT200")
+    removed, placed = model.apply_batch([(mat100, 0)], [(mat100, 2), (mat200, 1)])
+    assert removed == [(mat100, 0)]
+    assert placed == [(mat100, 2), (mat200, 1)]
+    assert model.plan[2] == [mat100] and mat200 in model.plan[1]
+    assert model.credit_totals()[:3] == [10, 20, 10]
+    assert events == ["batch_applied"]
+
+
+def test_apply_batch_is_all_or_nothing(model):
+    events = []
+    model.subscribe(lambda event, data: events.append(event))
+    before = model.to_json()
+    totals = model.credit_totals()
+    fys102, kje101, mat200, ele130, aero = _ids(model, "FYS102", "KJE101", "MAT200", "ELE130", "Ærø-1")
+    with pytest.raises(ValueError) as e:
+        # De to første er lov; vår-emnet i et høstsemester og 35 stp i semester 2 er ikke
+        model.apply_batch([], [(fys102, 0), (kje101, 0), (mat200, 0), (ele130, 1), (mat200, 1), (aero, 1)])
+    msg = str(e.value)
+    assert "MAT200 er et vår-emne" in msg and "Ikke plass i semester 2" in msg
+    assert model.to_json() == before
+    assert model.credit_totals() == totals
+    assert events == []
+    model.check_consistency()
+
+
+def test_apply_batch_rejects_unknown_course_and_semester(model):
+    before = model.to_json()
+    with pytest.raises(ValueError):
+        model.apply_batch([], [(999, 0)])
+    with pytest.raises(ValueError):
+        model.apply_batch([], [(_ids(model, "FYS102")[0], 6)])
+    assert model.to_json() == before
+
+
+def test_self_check_catches_stale_totals(model):
+    model._totals[0] += 5
+    with pytest.raises(AssertionError):
+        model.check_consistency()
+
+
+def test_add_courses_validates_like_add_course():
+    m = Model(self_check=True)
+    added, rejected = m.add_courses([
+        (1, " MAT100 ", "høst", 10),
+        (2, "  ", "høst", 10),
+        (3, "mat100", "høst", 10),
+        (4, "FYS102", "sommer", 10),
+        (5, "FYS103", "høst", 7.5),
+        (6, "FYS104", "vår", 31),
+    ])
+    assert added == 1
+    assert [c.kode for c in m.courses] == ["MAT100"]
+    assert [line for line, _ in rejected] == [2, 3, 4, 5, 6]
+
+
+def test_add_courses_keeps_ids_when_rows_fail_midway():
+    def rows():
+        yield 1, "A1", "høst", 5
+        yield 2, "A2", "vår", 5
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "ugyldig")
+
+    m = Model(self_check=True)
+    events = []
+    m.subscribe(lambda event, data: events.append((event, len(data.get("courses", ())))))
+    with pytest.raises(UnicodeDecodeError):
+        m.add_courses(rows())
+    assert events == [("courses_added", 2)]
+    assert m.add_course("A3", "høst", 5).id == 3
+    assert events[-1] == ("course_added", 0)
+    m.check_consistency()
+
+
+def test_rwlock_writer_excludes_readers():
+    lock = RWLock()
+    inside = []
+    lock.acquire_write()
+    lock.acquire_write()  # samme tråd kan ta skrivelåsen på nytt
+    lock.acquire_read()   # ... og leselåsen
+
+    def reader():
+        lock.acquire_read()
+        inside.append("leser")
+        lock.release_read()
+
+    t = threading.Thread(target=reader)
+    t.start()
+    t.join(0.05)
+    assert inside == []
+    lock.release_read()
+    lock.release_write()
+    t.join(0.05)
+    assert inside == []  # fortsatt én skrivelås igjen
+    lock.release_write()
+    t.join(1)
+    assert inside == ["leser"]
+
+
+def test_concurrent_writers_and_readers():
+    m = Model(self_check=True)
+    errors = []
+
+    def writer(k):
+        for i in range(100):
+            m.add_course(f"W{k}-{i}", "høst" if i % 2 else "vår", 5)
+
+    def reader():
+        try:
+            for _ in range(100):
+                snap = m.snapshot()
+                assert len(snap.courses) == len({c.id for c in snap.courses})
+                m.validate_plan()
+        except Exception as e:  # pragma: no cover - feiler testen nedenfor
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(k,)) for k in range(3)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(m.courses) == 300
+    m.check_consistency()
@@ -0,0 +1,80 @@
+import itertools
+import random
+
+import pytest
+
+from studieplan_core import Model, PlanShape
+from studieplan_solver import ALWAYS, NEVER, SOMETIMES
+
+
+def _semesters(model, term):
+    return [i for i, t in enumerate(model.shape.terms) if t == term]
+
+
+def _brute_force(model):
+    """Alle gyldige planer, som frozenset med (id, semesterindeks) for emnene som legges til."""
+    placed = {cid for sem in model.plan for cid in sem}
+    free = [c for c in model.courses if c.id not in placed]
+    options = [[None] + _semesters(model, c.semester) for c in free]
+    plans = set()
+    for choice in itertools.product(*options):
+        totals = model.credit_totals()
+        for c, sem in zip(free, choice):
+            if sem is not None:
+                totals[sem] += c.stp
+        if all(t == model.shape.target for t in totals):
+            plans.add(frozenset((c.id, sem) for c, sem in zip(free, choice) if sem is not None))
+    return plans
+
+
+def _random_model(seed):
+    rng = random.Random(seed)
+    m = Model(self_check=True, shape=PlanShape.alternating(rng.choice([2, 3]), 10, rng.choice(["høst", "vår"])))
+    for i in range(rng.randint(6, 9)):
+        m.add_course(f"K{i}", rng.choice(["høst", "vår"]), rng.choice([2, 3, 5, 5, 5, 10]))
+    # Noen emner ligger allerede i planen (hva-om-analyse)
+    for c in list(m.courses)[:2]:
+        sems = _semesters(m, c.semester)
+        if sems and m.credit_totals()[sems[0]] + c.stp <= m.shape.target:
+            m.add_course_to_semester(c.id, sems[0])
+    return m
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_count_flags_and_listing_match_brute_force(seed):
+    m = _random_model(seed)
+    plans = _brute_force(m)
+    assert m.count_plans() == len(plans)
+    listed = [frozenset(p) for p in m.iter_plans()]
+    assert len(listed) == len(set(listed))
+    assert set(listed) == plans
+    flags = m.placement_flags()
+    placed = {cid for sem in m.plan for cid in sem}
+    for c in m.courses:
+        if c.id in placed:
+            expected = ALWAYS if plans else NEVER
+        else:
+            n = sum(1 for p in plans if any(cid == c.id for cid, _ in p))
+            expected = NEVER if not n else ALWAYS if n == len(plans) else SOMETIMES
+        assert flags[c.id] == expected, c.kode
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_auto_plan_fills_when_a_plan_exists(seed):
+    m = _random_model(seed)
+    if not m.count_plans():
+        with pytest.raises(ValueError):
+            m.auto_plan()
+        return
+    m.auto_plan()
+    assert m.validate_plan() == []
+    m.check_consistency()
+
+
+def test_iter_plans_limit():
+    m = Model(shape=PlanShape.alternating(2, 10))
+    for i in range(6):
+        m.add_course(f"H{i}", "høst", 5)
+        m.add_course(f"V{i}", "vår", 5)
+    assert m.count_plans() == 15 * 15
+    assert len(list(m.iter_plans(limit=7))) == 7
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from conftest import same_plan, sample_model
+from studieplan_catalog import load_catalog, open_catalog, save_catalog
+from studieplan_core import Model, PlanShape
+from studieplan_io import load_plan, save_plan
+from studieplan_sqlite import SqliteStore
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_json_round_trip(model, tmp_path, compact):
+    path = str(tmp_path / "plan.json")
+    save_plan(model, path, compact=compact)
+    loaded = Model(self_check=True)
+    load_plan(loaded, path)
+    loaded.check_consistency()
+    assert same_plan(model, loaded)
+    # Samme innhold som json-modulen leser
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == model.to_json()
+
+
+def test_json_round_trip_with_shape(tmp_path):
+    model = sample_model(PlanShape.alternating(4, 20, "vår"))
+    path = str(tmp_path / "plan.json")
+    save_plan(model, path)
+    loaded = Model(self_check=True)
+    load_plan(loaded, path)
+    assert loaded.shape == model.shape
+    assert same_plan(model, loaded)
+
+
+def test_streaming_reader_handles_escapes_and_whitespace(tmp_path):
+    # Skrevet for hånd: escapes, ekstra mellomrom og ukjente felt
+    path = tmp_path / "plan.json"
+    path.write_text(
+        '{ "ukjent": {"a": [1, {"b": "}"}]},\n'
+        '  "next_id" : 4 ,\n'
+        '  "courses": [ {"id": 1, "kode": "M\\u00c5T\\"1", "semester": "h\\u00f8st", "stp": 10},\n'
+        '               {"id": 2, "kode": "X", "semester": "vinter", "stp": 5},\n'
+        '               {"id": 3, "kode": "B1", "semester": "vår", "stp": 10, "krav": [1]} ],\n'
+        '  "plan": [[1], [3], [], [], [], []] }\n', encoding="utf-8")
+    m = Model(self_check=True)
+    load_plan(m, str(path))
+    m.check_consistency()
+    assert [c.kode for c in m.courses] == ['MÅT"1', "B1"]  # ugyldig årstid kastes
+    assert m.get_course(3).krav == (1,)
+    assert m.plan[:2] == [[1], [3]]
+    assert m.next_id == 4
+
+
+def test_shared_load_keeps_plans_apart(model, tmp_path):
+    path = str(tmp_path / "plan.json")
+    save_plan(model, path)
+    a, b = Model(self_check=True), Model(self_check=True)
+    load_plan(a, path, shared=True)
+    load_plan(b, path, shared=True)
+    assert a.courses is b.courses
+    b.clear_semester(0)
+    a.check_consistency()
+    b.check_consistency()
+    assert same_plan(model, a)
+    assert b.plan[0] == []
+
+
+def test_sqlite_round_trip_with_changes(model, tmp_path):
+    path = str(tmp_path / "plan.sqlite")
+    store = SqliteStore(model, path)
+    store.start()
+    # Hver endring skrives straks til databasen
+    c = model.add_course("INF100", "høst", 5, krav=(model.find_course_by_code("MAT100").id,))
+    model.add_course_to_semester(c.id, 2)
+    model.delete_course(model.find_course_by_code("KJE101").id)
+    model.set_prerequisites(model.find_course_by_code("ELE130").id, [c.id])
+    model.add_courses([(1, "BULK1", "vår", 5), (2, "BULK2", "høst", 10)])
+    model.apply_batch([(model.find_course_by_code("DAT130").id, 1)],
+                      [(model.find_course_by_code("MAT200").id, 1)])
+    model.clear_semester(0)
+    store.close()
+    loaded = Model(self_check=True)
+    store, _ = SqliteStore.open(loaded, path)
+    store.close()
+    loaded.check_consistency()
+    assert same_plan(model, loaded)
+
+
+def test_sqlite_keeps_shape(tmp_path):
+    model = sample_model(PlanShape.alternating(4, 20, "høst"))
+    path = str(tmp_path / "plan.sqlite")
+    store = SqliteStore(model, path)
+    store.start()
+    store.close()
+    loaded = Model(self_check=True)
+    SqliteStore.open(loaded, path)[0].close()
+    assert loaded.shape == model.shape
+    assert same_plan(model, loaded)
+
+
+def test_catalog_round_trip(model, tmp_path):
+    path = str(tmp_path / "plan.spcat")
+    save_catalog(model, path)
+    mapped = Model(self_check=True)
+    open_catalog(mapped, path)
+    mapped.check_consistency()
+    assert same_plan(model, mapped)
+    assert mapped.find_course_by_code("ærø-1").kode == "Ærø-1"
+    assert [c.kode for c in mapped.search_courses("ma")] == ["MAT100", "MAT200"]
+    # Emnene er skrivebeskyttet, planen kan endres
+    with pytest.raises(ValueError):
+        mapped.add_course("NY100", "høst", 5)
+    mapped.add_course_to_semester(mapped.find_course_by_code("FYS102").id, 2)
+    mapped.check_consistency()
+
+    loaded = Model(self_check=True)
+    load_catalog(loaded, path)
+    loaded.check_consistency()
+    assert same_plan(model, loaded)
+    loaded.add_course("NY100", "høst", 5)  # vanlige, redigerbare emner